@@ -7,41 +7,76 @@ https://dev.to/gabrieldiem/how-to-download-google-meet-meeting-recordings-set-to
 import os
 import re
 import time
+import shutil
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter, Retry
 from tqdm import tqdm
-import gdown
-import yt_dlp
 
 logger = logging.getLogger("DownMeets.download")
 
+# Sessão persistente compartilhada entre downloads: reutiliza conexões
+# TCP/TLS (keep-alive) em vez de renegociar o handshake a cada requisição
+_SESSION = requests.Session()
+_SESSION.mount(
+    'https://',
+    HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=16,
+        max_retries=Retry(total=3, backoff_factor=0.3),
+    ),
+)
+
+# Tamanho do bloco de leitura/escrita nos downloads (1 MiB)
+CHUNK_SIZE = 1024 * 1024
+
+# Download paralelo por faixas HTTP Range
+RANGE_WORKERS = 4
+RANGE_MIN_SIZE = 8 * CHUNK_SIZE  # abaixo disso, uma única conexão basta
+
+# Expressões regulares compiladas uma vez no load do módulo
+_FILE_ID_RE = re.compile(r'/d/([a-zA-Z0-9_-]+)')
+_CONFIRM_RE = re.compile(r'confirm=([0-9A-Za-z_-]+)')
+_MEDIA_RE = re.compile(r'https://[^"\']*?googleusercontent\.com/[^"\'&?]+')
+
 
 def extract_file_id(url: str) -> str:
     """Extrai o ID do arquivo do Google Drive a partir da URL."""
-    pattern = r'/d/([a-zA-Z0-9_-]+)'
-    match = re.search(pattern, url)
-    
+    match = _FILE_ID_RE.search(url)
+
     if match:
         return match.group(1)
     else:
         raise ValueError("Não foi possível extrair o ID do arquivo da URL fornecida.")
 
 
-def download_with_ytdlp(url: str, output_path: str) -> bool:
+def download_with_ytdlp(url: str, output_path: str, cancel_event: Optional[threading.Event] = None) -> bool:
     """Baixa vídeo usando yt-dlp."""
+    # Import tardio: o yt-dlp compila centenas de regexes de extratores
+    # no import, o que atrasaria todo startup da CLI
+    import yt_dlp
+
     logger.info(f"Tentando baixar com yt-dlp: {url}")
-    
+
+    def _progress_hook(status):
+        # Abortar assim que outro método vencer a disputa
+        if cancel_event is not None and cancel_event.is_set():
+            raise yt_dlp.utils.DownloadError("Download cancelado: outro método concluiu primeiro")
+
     ydl_opts = {
         'format': 'best',
         'outtmpl': output_path,
         'quiet': False,
         'no_warnings': False,
         'ignoreerrors': False,
+        'progress_hooks': [_progress_hook],
     }
-    
+
     try:
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
             ydl.download([url])
@@ -57,7 +92,71 @@ def download_with_ytdlp(url: str, output_path: str) -> bool:
         return False
 
 
-def download_with_requests(url: str, output_path: str) -> bool:
+def _download_with_ranges(
+    session: requests.Session,
+    url: str,
+    headers: dict,
+    output_path: str,
+    file_size: int,
+    cancel_event: Optional[threading.Event] = None,
+) -> bool:
+    """
+    Baixa um arquivo em faixas HTTP Range paralelas escritas no offset correto.
+    Retorna True se todas as faixas foram baixadas com sucesso.
+    """
+    progress = tqdm(
+        desc=f"Baixando {os.path.basename(output_path)}",
+        total=file_size,
+        unit="B",
+        unit_scale=True,
+        unit_divisor=1024,
+    )
+
+    # Dividir o arquivo em faixas de tamanho semelhante entre os workers
+    part_size = -(-file_size // RANGE_WORKERS)  # divisão arredondada para cima
+    ranges = [
+        (start, min(start + part_size, file_size) - 1)
+        for start in range(0, file_size, part_size)
+    ]
+
+    fd = os.open(output_path, os.O_CREAT | os.O_WRONLY | os.O_TRUNC, 0o644)
+    try:
+        # Pré-alocar o arquivo para que cada worker escreva no seu offset
+        os.ftruncate(fd, file_size)
+
+        def fetch_range(start: int, end: int) -> bool:
+            range_headers = dict(headers)
+            range_headers['Range'] = f"bytes={start}-{end}"
+            response = session.get(url, headers=range_headers, stream=True)
+
+            if response.status_code != 206:
+                logger.warning(f"Servidor não respeitou a faixa {start}-{end} (status {response.status_code})")
+                return False
+
+            offset = start
+            for data in response.iter_content(chunk_size=CHUNK_SIZE):
+                if cancel_event is not None and cancel_event.is_set():
+                    return False
+                os.pwrite(fd, data, offset)
+                offset += len(data)
+                progress.update(len(data))
+
+            return offset == end + 1
+
+        with ThreadPoolExecutor(max_workers=RANGE_WORKERS) as executor:
+            results = list(executor.map(lambda r: fetch_range(*r), ranges))
+
+        return all(results)
+
+    except Exception as e:
+        logger.error(f"Erro no download por faixas: {e}")
+        return False
+    finally:
+        os.close(fd)
+        progress.close()
+
+
+def download_with_requests(url: str, output_path: str, cancel_event: Optional[threading.Event] = None) -> bool:
     """Tenta baixar usando requests."""
     logger.info(f"Tentando baixar com requests: {url}")
     
@@ -76,17 +175,17 @@ def download_with_requests(url: str, output_path: str) -> bool:
             'Referer': 'https://drive.google.com/',
         }
         
-        # Sessão para manter cookies
-        session = requests.Session()
+        # Sessão persistente para manter cookies e reutilizar conexões
+        session = _SESSION
         
         # Primeira requisição para obter cookies
         response = session.get(direct_url, headers=headers, stream=True)
         
         # Lidar com página de confirmação
         if 'confirm=' in response.url or 'confirm=' in response.text:
-            confirm_match = re.search(r'confirm=([0-9A-Za-z_-]+)', response.url)
+            confirm_match = _CONFIRM_RE.search(response.url)
             if not confirm_match:
-                confirm_match = re.search(r'confirm=([0-9A-Za-z_-]+)', response.text)
+                confirm_match = _CONFIRM_RE.search(response.text)
             
             if confirm_match:
                 confirm_token = confirm_match.group(1)
@@ -95,39 +194,64 @@ def download_with_requests(url: str, output_path: str) -> bool:
         
         # Verificar se recebemos um arquivo ou HTML
         if 'text/html' in response.headers.get('Content-Type', ''):
-            # Tentar extrair URL de mídia direta
-            media_urls = re.findall(r'https://.*?googleusercontent\.com/[^"\'&?]+', response.text)
-            media_urls = [u for u in media_urls if 'videoplayback' in u or 'media' in u]
-            
-            if media_urls:
-                logger.info(f"URL de mídia encontrada: {media_urls[0]}")
-                response = session.get(media_urls[0], headers=headers, stream=True)
+            # Tentar extrair URL de mídia direta, parando na primeira válida
+            media_url = None
+            for match in _MEDIA_RE.finditer(response.text):
+                candidate = match.group(0)
+                if 'videoplayback' in candidate or 'media' in candidate:
+                    media_url = candidate
+                    break
+
+            if media_url:
+                logger.info(f"URL de mídia encontrada: {media_url}")
+                response = session.get(media_url, headers=headers, stream=True)
             else:
                 return False
         
         # Obter tamanho do arquivo
         file_size = int(response.headers.get('content-length', 0))
-        
+
+        # Caminho rápido: faixas paralelas quando o servidor aceita Range
+        if (
+            file_size > RANGE_MIN_SIZE
+            and response.headers.get('Accept-Ranges', '').lower() == 'bytes'
+        ):
+            final_url = response.url
+            response.close()
+            if _download_with_ranges(session, final_url, headers, output_path, file_size, cancel_event):
+                return True
+            # Falha no modo paralelo: voltar ao fluxo de conexão única
+            logger.info("Download por faixas falhou, voltando ao fluxo de conexão única")
+            response = session.get(final_url, headers=headers, stream=True)
+
         if file_size > 0:
-            # Exibir progresso
-            progress = tqdm(
-                response.iter_content(1024),
-                f"Baixando {os.path.basename(output_path)}",
+            # Exibir progresso; o with fecha a barra mesmo no retorno do
+            # cancelamento, sem deixá-la aberta poluindo o terminal
+            with tqdm(
+                desc=f"Baixando {os.path.basename(output_path)}",
                 total=file_size,
                 unit="B",
                 unit_scale=True,
                 unit_divisor=1024,
-            )
-            
-            # Baixar o arquivo
-            with open(output_path, 'wb') as f:
-                for data in progress.iterable:
-                    f.write(data)
-                    progress.update(len(data))
+            ) as progress:
+                # Baixar o arquivo em blocos de 1 MiB para reduzir o overhead por iteração
+                with open(output_path, 'wb', buffering=CHUNK_SIZE) as f:
+                    for data in response.iter_content(chunk_size=CHUNK_SIZE):
+                        if cancel_event is not None and cancel_event.is_set():
+                            logger.info("Download com requests cancelado: outro método concluiu primeiro")
+                            return False
+                        f.write(data)
+                        progress.update(len(data))
         else:
-            # Sem content-length, baixar sem progresso
-            with open(output_path, 'wb') as f:
-                f.write(response.content)
+            # Sem content-length, copiar o stream em blocos para o disco sem
+            # materializar o corpo inteiro em memória (response.content),
+            # ainda observando o cancelamento entre um bloco e outro
+            with open(output_path, 'wb', buffering=CHUNK_SIZE) as f:
+                for data in response.iter_content(chunk_size=CHUNK_SIZE):
+                    if cancel_event is not None and cancel_event.is_set():
+                        logger.info("Download com requests cancelado: outro método concluiu primeiro")
+                        return False
+                    f.write(data)
         
         # Verificar se o arquivo baixado tem conteúdo
         if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
@@ -141,17 +265,25 @@ def download_with_requests(url: str, output_path: str) -> bool:
         return False
 
 
-def download_with_gdown(url: str, output_path: str) -> bool:
+def download_with_gdown(url: str, output_path: str, cancel_event: Optional[threading.Event] = None) -> bool:
     """Tenta baixar usando gdown."""
+    # Import tardio para não pesar no startup da CLI
+    import gdown
+
     logger.info(f"Tentando baixar com gdown: {url}")
-    
+
     try:
         # Extrair ID
         file_id = extract_file_id(url)
-        
+
         # Baixar com gdown
         gdown.download(id=file_id, output=output_path, quiet=False, fuzzy=True)
-        
+
+        # Descartar o resultado se outro método venceu a disputa
+        if cancel_event is not None and cancel_event.is_set():
+            logger.info("Download com gdown descartado: outro método concluiu primeiro")
+            return False
+
         # Verificar se o arquivo foi baixado com sucesso
         if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
             return True
@@ -164,28 +296,104 @@ def download_with_gdown(url: str, output_path: str) -> bool:
 
 
 def download_meet_video(url: str, output_path: str) -> bool:
-    """Baixa um vídeo do Google Meet usando múltiplos métodos."""
+    """
+    Baixa um vídeo do Google Meet disputando os métodos em paralelo.
+
+    Os três métodos (yt-dlp, requests e gdown) rodam simultaneamente em
+    arquivos temporários; o primeiro que concluir com sucesso vence e os
+    demais são cancelados, evitando esperar o timeout de um método lento.
+    """
     # Garantir que o diretório existe
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    
+
     logger.info(f"Baixando para: {output_path}")
-    
-    # Tentar diferentes métodos de download
-    if download_with_ytdlp(url, output_path):
-        logger.info("Download bem-sucedido com yt-dlp!")
-        return True
-    
-    logger.info("yt-dlp falhou, tentando método alternativo...")
-    
-    if download_with_requests(url, output_path):
-        logger.info("Download bem-sucedido com requests!")
-        return True
-    
-    logger.info("requests falhou, tentando gdown...")
-    
-    if download_with_gdown(url, output_path):
-        logger.info("Download bem-sucedido com gdown!")
+
+    methods = [
+        ("ytdlp", download_with_ytdlp),
+        ("requests", download_with_requests),
+        ("gdown", download_with_gdown),
+    ]
+
+    cancel_event = threading.Event()
+    winner_path = None
+    winner_name = None
+
+    executor = ThreadPoolExecutor(max_workers=len(methods))
+    futures = {}
+    for name, method in methods:
+        temp_path = f"{output_path}.{name}.part"
+        future = executor.submit(method, url, temp_path, cancel_event)
+        futures[future] = (name, temp_path)
+
+    try:
+        for future in as_completed(futures):
+            name, temp_path = futures[future]
+            try:
+                success = future.result()
+            except Exception as e:
+                logger.error(f"Erro no método {name}: {e}")
+                success = False
+
+            if success:
+                winner_path = temp_path
+                winner_name = name
+                # Sinalizar aos demais métodos que podem abortar e sair
+                # sem esperar os perdedores terminarem
+                cancel_event.set()
+                break
+    finally:
+        # Liberar o executor sem join: os métodos que não observam o
+        # cancel_event no meio do download (ex: gdown) terminam em
+        # segundo plano sem segurar o chamador
+        executor.shutdown(wait=False)
+
+    def _remove_temp(temp_path: str) -> None:
+        if os.path.exists(temp_path):
+            try:
+                os.remove(temp_path)
+            except OSError as e:
+                logger.warning(f"Não foi possível remover arquivo temporário {temp_path}: {e}")
+
+    # Remover os temporários perdedores quando cada método terminar de
+    # fato (não dá para apagar enquanto o método ainda escreve neles);
+    # para futures já concluídos o callback roda imediatamente
+    for future, (name, temp_path) in futures.items():
+        if temp_path != winner_path:
+            future.add_done_callback(
+                lambda fut, path=temp_path: _remove_temp(path)
+            )
+
+    if winner_path is not None:
+        shutil.move(winner_path, output_path)
+        logger.info(f"Download bem-sucedido com {winner_name}!")
         return True
-    
+
     logger.error("Todos os métodos de download falharam.")
-    return False
\ No newline at end of file
+    return False
+
+
+def download_many(urls_and_paths: List[Tuple[str, str]], max_workers: int = 4) -> Dict[str, bool]:
+    """
+    Baixa vários vídeos concorrentemente em vez de um por vez.
+
+    Recebe uma lista de pares (url, caminho_de_saida) e retorna um dicionário
+    url -> sucesso. O número de downloads simultâneos é limitado por
+    max_workers para não saturar a conexão nem o Google Drive.
+    """
+    results: Dict[str, bool] = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(download_meet_video, url, output_path): url
+            for url, output_path in urls_and_paths
+        }
+
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                results[url] = future.result()
+            except Exception as e:
+                logger.error(f"Erro ao baixar {url}: {e}")
+                results[url] = False
+
+    return results
\ No newline at end of file
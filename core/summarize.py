@@ -3,25 +3,98 @@ Módulo para gerar resumos de transcrições de vídeos do Google Meet.
 """
 
 import os
+import shelve
+import hashlib
 import logging
+import functools
+import threading
 from pathlib import Path
 from typing import Optional
 
-import openai
-
 logger = logging.getLogger("DownMeets.summarize")
 
+# Cache em disco de resumos já gerados, indexado pelo hash do conteúdo:
+# evita repetir chamadas (pagas) à API quando a transcrição não mudou
+SUMMARY_CACHE_PATH = os.path.expanduser("~/.downmeets_summaries")
+_summary_cache_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=32)
+def _read_transcription_cached(transcription_path: str, mtime_ns: int, size: int) -> str:
+    """Lê o conteúdo do arquivo; mtime_ns e size invalidam o cache se o arquivo mudar."""
+    with open(transcription_path, "r", encoding="utf-8") as f:
+        return f.read()
+
 
 def read_transcription(transcription_path: str) -> Optional[str]:
-    """Lê o arquivo de transcrição."""
+    """Lê o arquivo de transcrição, com cache invalidado por mtime/tamanho."""
     try:
-        with open(transcription_path, "r", encoding="utf-8") as f:
-            return f.read()
+        stat = os.stat(transcription_path)
+        return _read_transcription_cached(transcription_path, stat.st_mtime_ns, stat.st_size)
     except Exception as e:
         logger.exception(f"Erro ao ler arquivo de transcrição: {str(e)}")
         return None
 
 
+def _cache_key(transcription: str, model: str, language: str) -> str:
+    """Gera a chave do cache de resumos a partir do conteúdo e configuração."""
+    return hashlib.sha256((model + language + transcription).encode("utf-8")).hexdigest()
+
+
+def _cache_get(key: str) -> Optional[str]:
+    """Busca um resumo no cache em disco. Retorna None se não existir."""
+    with _summary_cache_lock:
+        with shelve.open(SUMMARY_CACHE_PATH) as cache:
+            return cache.get(key)
+
+
+def _cache_set(key: str, summary: str) -> None:
+    """Guarda um resumo no cache em disco."""
+    with _summary_cache_lock:
+        with shelve.open(SUMMARY_CACHE_PATH) as cache:
+            cache[key] = summary
+
+
+def _build_messages(transcription: str, language: str) -> list:
+    """Monta as mensagens do chat enviadas à API para gerar o resumo."""
+    prompt = f"""
+    Você é um especialista em resumir reuniões e criar notas de reunião.
+    Abaixo está a transcrição de uma reunião do Google Meet.
+    Por favor, gere um resumo estruturado que inclua:
+
+    1. Principais tópicos discutidos
+    2. Decisões tomadas
+    3. Tarefas atribuídas (com responsáveis, se mencionados)
+    4. Pontos importantes a serem lembrados
+    5. Próximos passos
+
+    O resumo deve ser claro, conciso e em formato markdown.
+    Idioma do resumo: {language}
+
+    Transcrição:
+    {transcription}
+    """
+
+    return [
+        {"role": "system", "content": "Você é um assistente especializado em resumir reuniões e criar notas de reunião."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def _extract_summary(response) -> Optional[str]:
+    """Extrai o texto do resumo da resposta da API."""
+    if (
+        hasattr(response, "choices") and
+        len(response.choices) > 0 and
+        hasattr(response.choices[0], "message") and
+        hasattr(response.choices[0].message, "content")
+    ):
+        return response.choices[0].message.content
+
+    logger.error(f"Resposta inesperada da API: {response}")
+    return None
+
+
 def generate_summary_with_openai(
     transcription: str,
     model: str,
@@ -30,61 +103,104 @@ def generate_summary_with_openai(
 ) -> Optional[str]:
     """
     Gera um resumo de uma transcrição usando a API GPT da OpenAI.
+    Reaproveita resumos do cache em disco quando a transcrição não mudou.
     Retorna o resumo se bem-sucedido, None caso contrário.
     """
+    # Import tardio: o SDK da OpenAI é pesado e só é necessário aqui
+    import openai
+
     try:
-        # Configurar a chave da API
-        openai.api_key = api_key
-        
-        # Criar a mensagem para a API
-        prompt = f"""
-        Você é um especialista em resumir reuniões e criar notas de reunião.
-        Abaixo está a transcrição de uma reunião do Google Meet.
-        Por favor, gere um resumo estruturado que inclua:
-
-        1. Principais tópicos discutidos
-        2. Decisões tomadas
-        3. Tarefas atribuídas (com responsáveis, se mencionados)
-        4. Pontos importantes a serem lembrados
-        5. Próximos passos
-
-        O resumo deve ser claro, conciso e em formato markdown.
-        Idioma do resumo: {language}
-
-        Transcrição:
-        {transcription}
-        """
-        
-        # Chamar a API para gerar o resumo
-        response = openai.ChatCompletion.create(
+        # Verificar o cache antes de chamar a API
+        cache_key = _cache_key(transcription, model, language)
+        cached = _cache_get(cache_key)
+        if cached is not None:
+            logger.info("Resumo encontrado no cache, pulando chamada à API")
+            return cached
+
+        # Chamar a API para gerar o resumo (cliente openai>=1.0)
+        client = openai.OpenAI(api_key=api_key)
+        response = client.chat.completions.create(
             model=model,
-            messages=[
-                {"role": "system", "content": "Você é um assistente especializado em resumir reuniões e criar notas de reunião."},
-                {"role": "user", "content": prompt}
-            ],
+            messages=_build_messages(transcription, language),
             temperature=0.5,
             max_tokens=4000
         )
-        
-        # Extrair o resumo da resposta
-        if (
-            hasattr(response, "choices") and 
-            len(response.choices) > 0 and 
-            hasattr(response.choices[0], "message") and 
-            hasattr(response.choices[0].message, "content")
-        ):
-            return response.choices[0].message.content
-        elif isinstance(response, dict) and "choices" in response:
-            return response["choices"][0]["message"]["content"]
-        else:
-            logger.error(f"Resposta inesperada da API: {response}")
+
+        summary = _extract_summary(response)
+        if summary is None:
             return None
-            
+
+        # Guardar no cache para runs futuras com a mesma transcrição
+        _cache_set(cache_key, summary)
+
+        return summary
+
     except Exception as e:
         logger.exception(f"Erro ao gerar resumo com OpenAI: {str(e)}")
         return None
 
 
+async def generate_summary_async(
+    transcription: str,
+    model: str,
+    language: str,
+    api_key: str
+) -> Optional[str]:
+    """
+    Versão assíncrona de generate_summary_with_openai, para gerar vários
+    resumos concorrentemente em modo lote.
+    """
+    import openai
+
+    try:
+        cache_key = _cache_key(transcription, model, language)
+        cached = _cache_get(cache_key)
+        if cached is not None:
+            logger.info("Resumo encontrado no cache, pulando chamada à API")
+            return cached
+
+        client = openai.AsyncOpenAI(api_key=api_key)
+        response = await client.chat.completions.create(
+            model=model,
+            messages=_build_messages(transcription, language),
+            temperature=0.5,
+            max_tokens=4000
+        )
+
+        summary = _extract_summary(response)
+        if summary is None:
+            return None
+
+        _cache_set(cache_key, summary)
+
+        return summary
+
+    except Exception as e:
+        logger.exception(f"Erro ao gerar resumo assíncrono com OpenAI: {str(e)}")
+        return None
+
+
+def generate_summaries_batch(
+    transcriptions: list,
+    model: str,
+    language: str,
+    api_key: str
+) -> list:
+    """
+    Gera resumos para várias transcrições concorrentemente.
+    Retorna a lista de resumos na mesma ordem das transcrições (None nas falhas).
+    """
+    import asyncio
+
+    async def _run():
+        return await asyncio.gather(*(
+            generate_summary_async(transcription, model, language, api_key)
+            for transcription in transcriptions
+        ))
+
+    return asyncio.run(_run())
+
+
 def generate_summary(
     transcription_path: str,
     output_path: str,
@@ -3,15 +3,15 @@ Módulo para transcrever vídeos do Google Meet.
 """
 
 import os
+import json
 import logging
 import tempfile
 import subprocess
 import math
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, List
 
-from openai import OpenAI
-
 logger = logging.getLogger("DownMeets.transcribe")
 
 # Limite de tamanho para a API Whisper (em MB)
@@ -59,17 +59,42 @@ def extract_audio(video_path: str, output_path: Optional[str] = None) -> Optiona
         return None
 
 
-def get_audio_duration(audio_path: str) -> Optional[float]:
-    """Obtém a duração de um arquivo de áudio em segundos usando ffprobe."""
+def extract_audio_stream(video_path: str) -> Optional[subprocess.Popen]:
+    """
+    Inicia o ffmpeg extraindo o áudio do vídeo direto para stdout (pipe),
+    sem gravar um MP3 temporário em disco.
+    Retorna o processo ffmpeg, ou None em caso de erro.
+    """
+    try:
+        command = [
+            "ffmpeg", "-i", video_path, "-q:a", "0", "-map", "a", "-f", "mp3", "pipe:1"
+        ]
+        return subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+    except Exception as e:
+        logger.exception(f"Erro ao iniciar extração de áudio via pipe: {str(e)}")
+        return None
+
+
+def probe_audio(audio_path: str) -> Optional[dict]:
+    """
+    Obtém duração, tamanho e bitrate de um arquivo de áudio com uma única
+    chamada ao ffprobe.
+    Retorna um dicionário {'duration', 'size', 'bit_rate'} (valores podem
+    ser None se ausentes), ou None em caso de erro.
+    """
     try:
         command = [
             "ffprobe",
             "-v", "error",
-            "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1",
+            "-show_entries", "format=duration,size,bit_rate",
+            "-of", "json",
             audio_path
         ]
-        
+
         process = subprocess.run(
             command,
             stdout=subprocess.PIPE,
@@ -77,75 +102,103 @@ def get_audio_duration(audio_path: str) -> Optional[float]:
             text=True,
             check=False
         )
-        
+
         if process.returncode != 0:
-            logger.error(f"Erro ao obter duração do áudio: {process.stderr}")
+            logger.error(f"Erro ao obter informações do áudio: {process.stderr}")
             return None
-        
-        return float(process.stdout.strip())
-        
+
+        fmt = json.loads(process.stdout).get("format", {})
+        return {
+            "duration": float(fmt["duration"]) if "duration" in fmt else None,
+            "size": int(fmt["size"]) if "size" in fmt else None,
+            "bit_rate": int(fmt["bit_rate"]) if "bit_rate" in fmt else None,
+        }
+
     except Exception as e:
-        logger.exception(f"Erro ao obter duração do áudio: {str(e)}")
+        logger.exception(f"Erro ao obter informações do áudio: {str(e)}")
         return None
 
 
-def split_audio_with_ffmpeg(audio_path: str, max_size_mb: int = MAX_AUDIO_SIZE_MB) -> List[str]:
+def get_audio_duration(audio_path: str) -> Optional[float]:
+    """Obtém a duração de um arquivo de áudio em segundos usando ffprobe."""
+    info = probe_audio(audio_path)
+    return info["duration"] if info else None
+
+
+def split_audio_with_ffmpeg(
+    audio_path: str,
+    max_size_mb: int = MAX_AUDIO_SIZE_MB,
+    file_size: Optional[int] = None
+) -> List[str]:
     """
     Divide um arquivo de áudio em segmentos menores usando ffmpeg.
+    Aceita o tamanho do arquivo em bytes já conhecido para evitar um novo stat.
     Retorna uma lista de caminhos para os arquivos de áudio resultantes.
     """
     try:
-        # Verificar o tamanho do arquivo
-        file_size_mb = os.path.getsize(audio_path) / (1024 * 1024)
-        
+        # Verificar o tamanho do arquivo (reaproveitando o stat do chamador)
+        if file_size is None:
+            file_size = os.stat(audio_path).st_size
+        file_size_mb = file_size / (1024 * 1024)
+
         if file_size_mb <= max_size_mb:
             # Se o arquivo for pequeno o suficiente, retornar o caminho original
             return [audio_path]
         
-        # Obter a duração do áudio
-        duration = get_audio_duration(audio_path)
-        if duration is None:
+        # Obter duração e bitrate com uma única chamada ao ffprobe
+        info = probe_audio(audio_path)
+        if info is None or info["duration"] is None:
             logger.warning("Não foi possível obter a duração do áudio. Usando o arquivo original.")
             return [audio_path]
-        
-        # Estimar quantas partes são necessárias (relação aproximada entre tamanho e duração)
-        num_parts = math.ceil(file_size_mb / max_size_mb)
-        segment_duration = math.ceil(duration / num_parts)
-        
+        duration = info["duration"]
+
+        if info["bit_rate"]:
+            # Com o bitrate dá para calcular exatamente quantos segundos
+            # cabem no limite da API, evitando segmentos grandes demais
+            segment_duration = math.floor((max_size_mb * 8 * 1024 * 1024) / info["bit_rate"])
+        else:
+            # Estimar pela proporção tamanho/duração
+            num_parts = math.ceil(file_size_mb / max_size_mb)
+            segment_duration = math.ceil(duration / num_parts)
+
         # Diretório para armazenar os segmentos
         temp_dir = tempfile.mkdtemp()
-        segments = []
-        
-        for i in range(num_parts):
-            start_time = i * segment_duration
-            output_segment = os.path.join(temp_dir, f"segment_{i}.mp3")
-            
-            # Comando para extrair o segmento
-            command = [
-                "ffmpeg",
-                "-i", audio_path,
-                "-ss", str(start_time),
-                "-t", str(segment_duration),
-                "-acodec", "copy",
-                output_segment,
-                "-y"
-            ]
-            
-            process = subprocess.run(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                check=False
-            )
-            
-            if process.returncode != 0:
-                logger.error(f"Erro ao dividir áudio (segmento {i}): {process.stderr}")
-                continue
-                
-            if os.path.exists(output_segment) and os.path.getsize(output_segment) > 0:
-                segments.append(output_segment)
-            
+
+        # Uma única passada do ffmpeg corta todos os segmentos, em vez de
+        # um processo por segmento re-lendo o arquivo desde o início
+        command = [
+            "ffmpeg",
+            "-i", audio_path,
+            "-f", "segment",
+            "-segment_time", str(segment_duration),
+            "-c", "copy",
+            "-reset_timestamps", "1",
+            os.path.join(temp_dir, "segment_%03d.mp3"),
+            "-y"
+        ]
+
+        process = subprocess.run(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            check=False
+        )
+
+        if process.returncode != 0:
+            # O muxer de segmentos pode falhar em alguns containers;
+            # cair para a extração por segmento em processos paralelos
+            logger.warning(f"Passada única de segmentação falhou: {process.stderr}")
+            return _split_audio_per_segment(audio_path, temp_dir, duration, segment_duration)
+
+        # Coletar os segmentos gerados em ordem
+        segments = sorted(
+            os.path.join(temp_dir, name)
+            for name in os.listdir(temp_dir)
+            if name.startswith("segment_") and name.endswith(".mp3")
+        )
+        segments = [s for s in segments if os.path.getsize(s) > 0]
+
         if not segments:
             logger.warning("Não foi possível dividir o áudio. Usando o arquivo original.")
             return [audio_path]
@@ -158,6 +211,64 @@ def split_audio_with_ffmpeg(audio_path: str, max_size_mb: int = MAX_AUDIO_SIZE_M
         return [audio_path]
 
 
+def _split_audio_per_segment(
+    audio_path: str,
+    temp_dir: str,
+    duration: float,
+    segment_duration: int
+) -> List[str]:
+    """
+    Fallback da divisão: extrai cada segmento com um ffmpeg -ss/-t próprio.
+    Os processos são independentes e rodam em paralelo, em vez do laço
+    serial que relia o arquivo uma vez por segmento.
+    """
+    num_parts = math.ceil(duration / segment_duration)
+    tasks = [
+        (i * segment_duration, os.path.join(temp_dir, f"segment_{i:03d}.mp3"))
+        for i in range(num_parts)
+    ]
+
+    def extract_segment(task) -> Optional[str]:
+        start_time, output_segment = task
+        command = [
+            "ffmpeg",
+            "-i", audio_path,
+            "-ss", str(start_time),
+            "-t", str(segment_duration),
+            "-acodec", "copy",
+            output_segment,
+            "-y"
+        ]
+
+        process = subprocess.run(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            check=False
+        )
+
+        if process.returncode != 0:
+            logger.error(f"Erro ao extrair segmento {output_segment}: {process.stderr}")
+            return None
+
+        if os.path.exists(output_segment) and os.path.getsize(output_segment) > 0:
+            return output_segment
+        return None
+
+    with ThreadPoolExecutor(max_workers=min(os.cpu_count() or 1, num_parts)) as executor:
+        results = list(executor.map(extract_segment, tasks))
+
+    segments = [s for s in results if s is not None]
+
+    if not segments:
+        logger.warning("Não foi possível dividir o áudio. Usando o arquivo original.")
+        return [audio_path]
+
+    logger.info(f"Áudio dividido em {len(segments)} segmentos")
+    return segments
+
+
 def transcribe_with_openai(audio_path: str, model: str, api_key: str) -> Optional[str]:
     """
     Transcreve um arquivo de áudio usando a API Whisper da OpenAI.
@@ -165,31 +276,52 @@ def transcribe_with_openai(audio_path: str, model: str, api_key: str) -> Optiona
     Retorna o texto transcrito se bem-sucedido, None caso contrário.
     """
     try:
-        # Inicializar o cliente OpenAI com a chave da API
-        client = OpenAI(api_key=api_key)
-        
-        # Abrir o arquivo de áudio
+        # Abrir o arquivo de áudio e enviar à API
         with open(audio_path, "rb") as audio_file:
-            # Chamar a API de transcrição com a nova sintaxe
-            response = client.audio.transcriptions.create(
-                model=model,
-                file=audio_file
-            )
-        
-        # Extrair o texto transcrito
-        if hasattr(response, "text"):
-            return response.text
-        elif isinstance(response, dict) and "text" in response:
-            return response["text"]
-        else:
-            logger.error(f"Resposta inesperada da API: {response}")
-            return None
-            
+            return _transcribe_file_with_openai(audio_file, model, api_key)
+
     except Exception as e:
         logger.exception(f"Erro ao transcrever com OpenAI: {str(e)}")
         return None
 
 
+def transcribe_stream_with_openai(stream, model: str, api_key: str) -> Optional[str]:
+    """
+    Transcreve áudio lido de um stream (ex: stdout do ffmpeg) usando a API
+    Whisper da OpenAI, sem precisar de um arquivo em disco.
+    Retorna o texto transcrito se bem-sucedido, None caso contrário.
+    """
+    try:
+        return _transcribe_file_with_openai(("audio.mp3", stream, "audio/mpeg"), model, api_key)
+    except Exception as e:
+        logger.exception(f"Erro ao transcrever stream com OpenAI: {str(e)}")
+        return None
+
+
+def _transcribe_file_with_openai(audio_file, model: str, api_key: str) -> Optional[str]:
+    """Envia um arquivo (ou stream) de áudio à API Whisper e extrai o texto."""
+    # Import tardio: o SDK da OpenAI (pydantic, httpx) é pesado de importar
+    from openai import OpenAI
+
+    # Inicializar o cliente OpenAI com a chave da API
+    client = OpenAI(api_key=api_key)
+
+    # Chamar a API de transcrição com a nova sintaxe
+    response = client.audio.transcriptions.create(
+        model=model,
+        file=audio_file
+    )
+
+    # Extrair o texto transcrito
+    if hasattr(response, "text"):
+        return response.text
+    elif isinstance(response, dict) and "text" in response:
+        return response["text"]
+    else:
+        logger.error(f"Resposta inesperada da API: {response}")
+        return None
+
+
 def transcribe_video(video_path: str, output_path: str, model: str, api_key: str) -> bool:
     """
     Transcreve um vídeo e salva a transcrição em um arquivo de texto.
@@ -202,7 +334,27 @@ def transcribe_video(video_path: str, output_path: str, model: str, api_key: str
             
         # Garantir que o diretório existe
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        
+
+        # Caminho rápido: vídeos pequenos geram áudio abaixo do limite da
+        # API, então dá para transcrever direto do pipe do ffmpeg, sem
+        # gravar (e reler) o MP3 intermediário em disco
+        video_size_mb = os.path.getsize(video_path) / (1024 * 1024)
+        if video_size_mb <= MAX_AUDIO_SIZE_MB:
+            logger.info(f"Transcrevendo direto do pipe do ffmpeg ({video_size_mb:.2f} MB)")
+            process = extract_audio_stream(video_path)
+            if process is not None:
+                transcription = transcribe_stream_with_openai(process.stdout, model, api_key)
+                process.stdout.close()
+                process.wait()
+
+                if transcription:
+                    with open(output_path, "w", encoding="utf-8") as f:
+                        f.write(transcription)
+                    logger.info(f"Transcrição salva em: {output_path}")
+                    return True
+
+            logger.warning("Transcrição via pipe falhou, usando arquivo temporário")
+
         # Extrair o áudio do vídeo
         logger.info(f"Extraindo áudio do vídeo: {video_path}")
         audio_path = extract_audio(video_path)
@@ -211,38 +363,42 @@ def transcribe_video(video_path: str, output_path: str, model: str, api_key: str
             logger.error("Falha ao extrair áudio do vídeo")
             return False
         
-        # Verificar o tamanho do arquivo de áudio
-        file_size_mb = os.path.getsize(audio_path) / (1024 * 1024)
-        logger.info(f"Tamanho do arquivo de áudio: {file_size_mb:.2f} MB")
-        
+        # Verificar o tamanho do arquivo de áudio com um único stat
+        audio_size = os.stat(audio_path).st_size
+        logger.info(f"Tamanho do arquivo de áudio: {audio_size / (1024 * 1024):.2f} MB")
+
         # Dividir o áudio em segmentos se necessário
-        audio_segments = split_audio_with_ffmpeg(audio_path)
-        
-        # Transcrever cada segmento
-        full_transcription = ""
-        for i, segment_path in enumerate(audio_segments):
-            logger.info(f"Transcrevendo segmento {i+1}/{len(audio_segments)}")
-            segment_transcription = transcribe_with_openai(segment_path, model, api_key)
-            
-            if segment_transcription is None:
-                logger.error(f"Falha ao transcrever segmento {i+1}")
-                continue
-            
-            # Adicionar a transcrição do segmento ao resultado final
-            full_transcription += segment_transcription + "\n\n"
-            
-            # Remover o arquivo de áudio temporário se for um segmento
-            if len(audio_segments) > 1 and segment_path != audio_path:
-                try:
-                    os.remove(segment_path)
-                except Exception as e:
-                    logger.warning(f"Não foi possível remover o arquivo de áudio temporário: {str(e)}")
+        audio_segments = split_audio_with_ffmpeg(audio_path, file_size=audio_size)
         
-        # Remover o arquivo de áudio original
+        # Transcrever os segmentos em paralelo: cada chamada à API Whisper
+        # bloqueia por vários segundos, então o tempo total vira o do
+        # segmento mais lento em vez da soma de todos
+        logger.info(f"Transcrevendo {len(audio_segments)} segmento(s)")
         try:
-            os.remove(audio_path)
-        except Exception as e:
-            logger.warning(f"Não foi possível remover o arquivo de áudio original: {str(e)}")
+            with ThreadPoolExecutor(max_workers=min(8, len(audio_segments))) as executor:
+                results = list(executor.map(
+                    lambda path: transcribe_with_openai(path, model, api_key),
+                    audio_segments
+                ))
+        finally:
+            # Remover os arquivos de áudio temporários (segmentos e original)
+            for segment_path in audio_segments:
+                if segment_path != audio_path:
+                    try:
+                        os.remove(segment_path)
+                    except Exception as e:
+                        logger.warning(f"Não foi possível remover o arquivo de áudio temporário: {str(e)}")
+            try:
+                os.remove(audio_path)
+            except Exception as e:
+                logger.warning(f"Não foi possível remover o arquivo de áudio original: {str(e)}")
+
+        # Juntar as transcrições preservando a ordem dos segmentos
+        for i, segment_transcription in enumerate(results):
+            if segment_transcription is None:
+                logger.error(f"Falha ao transcrever segmento {i+1}/{len(audio_segments)}")
+
+        full_transcription = "\n\n".join(r for r in results if r is not None)
         
         if not full_transcription:
             logger.error("Nenhuma transcrição gerada")
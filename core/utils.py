@@ -4,21 +4,37 @@ Módulo de utilidades para o DownMeets.
 
 import os
 import sys
-import time
+import shutil
+import functools
 import subprocess
 import logging
+import threading
+import importlib.util
 from typing import List, Optional
 
 logger = logging.getLogger("DownMeets.utils")
 
 
+# Evento usado para interromper a espera entre processamentos
+_WAIT = threading.Event()
+
+
 def wait_between_items(minutes: int) -> None:
-    """Aguarda um tempo especificado entre processamentos."""
+    """
+    Aguarda um tempo especificado entre processamentos.
+    A espera pode ser interrompida por cancel_wait() (ex: no encerramento).
+    """
     if minutes <= 0:
         return
-    
+
     logger.info(f"Aguardando {minutes} minuto(s) antes do próximo processamento...")
-    time.sleep(minutes * 60)
+    _WAIT.wait(timeout=minutes * 60)
+    _WAIT.clear()
+
+
+def cancel_wait() -> None:
+    """Interrompe imediatamente a espera em andamento de wait_between_items."""
+    _WAIT.set()
 
 
 def check_dependencies(need_openai: bool = False, need_ffmpeg: bool = False) -> List[str]:
@@ -34,10 +50,10 @@ def check_dependencies(need_openai: bool = False, need_ffmpeg: bool = False) ->
     if need_openai:
         required_packages.append("openai")
     
+    # find_spec só consulta os metadados do pacote, sem executar o código
+    # de import (openai e yt_dlp são pesados de importar)
     for package in required_packages:
-        try:
-            __import__(package)
-        except ImportError:
+        if importlib.util.find_spec(package) is None:
             missing.append(package)
     
     # Verificar FFmpeg se necessário
@@ -47,18 +63,14 @@ def check_dependencies(need_openai: bool = False, need_ffmpeg: bool = False) ->
     return missing
 
 
+@functools.lru_cache(maxsize=1)
 def is_ffmpeg_installed() -> bool:
-    """Verifica se o FFmpeg está instalado."""
-    try:
-        result = subprocess.run(
-            ["ffmpeg", "-version"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-        return result.returncode == 0
-    except FileNotFoundError:
-        return False
+    """
+    Verifica se o FFmpeg está instalado.
+    Consulta o PATH em vez de executar o binário, e guarda o resultado
+    para não repetir a verificação a cada item do lote.
+    """
+    return shutil.which("ffmpeg") is not None
 
 
 def install_python_dependencies(missing_packages: List[str]) -> bool:
@@ -70,15 +82,17 @@ def install_python_dependencies(missing_packages: List[str]) -> bool:
         return True
     
     logger.info(f"Tentando instalar dependências ausentes: {', '.join(missing_packages)}")
-    
-    for package in missing_packages:
-        try:
-            logger.info(f"Instalando {package}...")
-            subprocess.check_call([sys.executable, "-m", "pip", "install", package])
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Falha ao instalar {package}: {e}")
-            return False
-    
+
+    # Uma única invocação do pip instala tudo de uma vez: paga o custo de
+    # startup/resolução só uma vez e resolve as dependências em conjunto
+    try:
+        subprocess.check_call(
+            [sys.executable, "-m", "pip", "install", "--no-input", *missing_packages]
+        )
+    except subprocess.CalledProcessError as e:
+        logger.error(f"Falha ao instalar dependências ({', '.join(missing_packages)}): {e}")
+        return False
+
     return True
 
 
@@ -7,34 +7,139 @@ https://dev.to/gabrieldiem/how-to-download-google-meet-meeting-recordings-set-to
 import re
 import os
 import sys
+import json
+import mmap
 import time
+import atexit
+import functools
+import threading
+import multiprocessing
 import subprocess
+import importlib.util
+import queue
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 
-# Garantir que as dependências necessárias estão instaladas
+# Logging via fila: os workers só enfileiram o registro (sem lock de
+# stdout) e um listener único cuida da escrita no terminal, evitando
+# contenção entre downloads concorrentes
+_log_queue = queue.Queue(-1)
+_log_listener = QueueListener(_log_queue, logging.StreamHandler())
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+logger = logging.getLogger("downmeets")
+logger.addHandler(QueueHandler(_log_queue))
+logger.setLevel(logging.INFO)
+
+# Garantir que as dependências necessárias estão instaladas.
+# find_spec só consulta os metadados (não executa o módulo), e o pip só
+# roda se o usuário optar por isso via DOWNMEETS_AUTO_INSTALL=1
 required_packages = ["yt-dlp", "requests", "tqdm", "gdown"]
-for package in required_packages:
-    try:
-        __import__(package)
-    except ImportError:
-        print(f"Instalando {package}...")
-        subprocess.check_call([sys.executable, "-m", "pip", "install", package])
+missing_packages = [
+    package for package in required_packages
+    if importlib.util.find_spec(package.replace("-", "_")) is None
+]
+if missing_packages:
+    if os.environ.get("DOWNMEETS_AUTO_INSTALL") == "1":
+        logger.info(f"Instalando dependências ausentes: {', '.join(missing_packages)}...")
+        subprocess.check_call([sys.executable, "-m", "pip", "install", *missing_packages])
+    else:
+        raise SystemExit(
+            f"Dependências ausentes: {', '.join(missing_packages)}. "
+            "Instale manualmente ou execute com DOWNMEETS_AUTO_INSTALL=1."
+        )
 
 import requests
+from requests.adapters import HTTPAdapter, Retry
+from urllib3.exceptions import ProtocolError
 from tqdm import tqdm
 import yt_dlp
 import gdown
 
+# Parser HTML em C (opcional): bem mais rápido que regex com backtracking
+# nas páginas grandes de cota/intersticial do Drive
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
 # Configurações
-URL_FILE = "urls.txt"  # Arquivo com as URLs
-OUTPUT_DIR = "meets"   # Diretório de saída
-DELAY_MINUTES = 5      # Atraso entre downloads em minutos
+URL_FILE = "urls.txt"           # Arquivo com as URLs
+OUTPUT_DIR = "meets"            # Diretório de saída
+MAX_CONCURRENT_DOWNLOADS = 4    # Downloads simultâneos no modo lote
+MAX_QUOTA_BACKOFF = 60          # Espera máxima (s) após sinal de cota do Drive
+
+# Tamanho do bloco de leitura/escrita (1 MiB por padrão): blocos grandes
+# reduzem drasticamente o número de syscalls por vídeo
+DOWNLOAD_CHUNK_SIZE = int(os.environ.get("DOWNMEETS_CHUNK_SIZE", 1024 * 1024))
+
+# Tentativas de retomada (HTTP Range) quando a conexão cai no meio do stream
+RESUME_ATTEMPTS = int(os.environ.get("DOWNMEETS_RESUME_ATTEMPTS", 10))
+
+# Escrita via mmap em arquivo pré-alocado (opt-in): evita os write() com
+# GIL e as atualizações de metadados de crescimento do arquivo. Alguns
+# filesystems (ex: sshfs) lidam mal com mmap, por isso fica atrás de env
+USE_MMAP = os.environ.get("DOWNMEETS_USE_MMAP") == "1"
+
+# Cache de tokens de confirmação do Drive por file_id: evita refazer o
+# roundtrip da página HTML de aviso a cada retry/retomada do mesmo
+# arquivo. Persistido entre execuções em ~/.downmeets/confirm_cache.json
+_CONFIRM_CACHE_PATH = os.path.expanduser("~/.downmeets/confirm_cache.json")
+_confirm_cache = {}
+_confirm_cache_lock = threading.Lock()
 
+try:
+    with open(_CONFIRM_CACHE_PATH, "r") as _f:
+        _confirm_cache = json.load(_f)
+except (OSError, ValueError):
+    pass
+
+def _save_confirm_cache():
+    """Grava o cache de tokens de confirmação no encerramento do script."""
+    with _confirm_cache_lock:
+        if not _confirm_cache:
+            return
+        try:
+            os.makedirs(os.path.dirname(_CONFIRM_CACHE_PATH), exist_ok=True)
+            with open(_CONFIRM_CACHE_PATH, "w") as f:
+                json.dump(_confirm_cache, f)
+        except OSError:
+            pass
+
+atexit.register(_save_confirm_cache)
+
+# Expressões regulares compiladas uma única vez no load do módulo
+_FILE_ID_RE = re.compile(r'/d/([a-zA-Z0-9_-]+)')
+_CONFIRM_RE = re.compile(r'confirm=([0-9A-Za-z_-]+)')
+_MEDIA_RE = re.compile(r'https://[^"\'&?]*?googleusercontent\.com/[^"\'&?]+')
+
+# Sessão única compartilhada por todos os downloads: reutiliza conexões
+# keep-alive com drive.google.com/googleusercontent.com em vez de refazer
+# DNS + TCP + TLS a cada vídeo
+_SESSION = requests.Session()
+_SESSION.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Referer': 'https://drive.google.com/',
+})
+_SESSION.mount(
+    'https://',
+    HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=32,
+        max_retries=Retry(total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]),
+    ),
+)
+
+@functools.lru_cache(maxsize=256)
 def extract_file_id(url):
     """Extrai o ID do arquivo do Google Drive a partir da URL."""
-    pattern = r'/d/([a-zA-Z0-9_-]+)'
-    match = re.search(pattern, url)
-    
+    match = _FILE_ID_RE.search(url)
+
     if match:
         return match.group(1)
     else:
@@ -44,27 +149,67 @@ def ensure_directory_exists(directory):
     """Garante que o diretório exista, criando-o se necessário."""
     Path(directory).mkdir(parents=True, exist_ok=True)
 
+def _is_nonempty(path):
+    """Retorna True se o arquivo existe e tem conteúdo, com um único stat."""
+    try:
+        return os.stat(path).st_size > 0
+    except OSError:
+        return False
+
+@functools.lru_cache(maxsize=1024)
 def generate_filename(file_id, index=None, extension="mp4"):
     """Gera um nome de arquivo baseado no ID e índice."""
     if index is not None:
         return f"meet_{index:03d}_{file_id[-6:]}.{extension}"
     return f"meet_{file_id[-6:]}.{extension}"
 
-def wait_between_downloads(minutes=DELAY_MINUTES):
-    """Aguarda um tempo específico entre downloads."""
-    print(f"Aguardando {minutes} minuto(s) antes do próximo download...")
-    time.sleep(minutes * 60)
+# Backoff adaptativo: em vez de uma espera fixa entre downloads, só
+# aguardamos quando o Drive sinaliza limite de cota (HTTP 429/403),
+# respeitando o Retry-After informado pelo servidor
+_quota_lock = threading.Lock()
+_quota_wait_until = 0.0
+
+def _note_quota_hit(response):
+    """Registra um sinal de cota do Drive e agenda o backoff correspondente."""
+    global _quota_wait_until
+    try:
+        retry_after = int(response.headers.get('Retry-After', 15))
+    except ValueError:
+        retry_after = 15
+    retry_after = min(retry_after, MAX_QUOTA_BACKOFF)
+
+    with _quota_lock:
+        _quota_wait_until = max(_quota_wait_until, time.time() + retry_after)
+
+    logger.warning(f"Limite de cota do Drive (HTTP {response.status_code}), aguardando {retry_after}s...")
+
+def _respect_quota_backoff():
+    """Espera até o fim da janela de backoff agendada, se houver."""
+    with _quota_lock:
+        wait_seconds = _quota_wait_until - time.time()
+
+    if wait_seconds > 0:
+        time.sleep(wait_seconds)
 
 def download_with_ytdlp(url, output_path):
     """Baixa vídeo usando yt-dlp."""
-    print(f"Tentando baixar com yt-dlp: {url}")
+    logger.info(f"Tentando baixar com yt-dlp: {url}")
     
     ydl_opts = {
-        'format': 'best',
+        # Preferir um stream progressivo mp4 único: 'best' sozinho pode
+        # escolher vídeo+áudio separados e disparar um merge do ffmpeg
+        # que dobra o I/O de disco
+        'format': 'best[ext=mp4][protocol^=http]/best[ext=mp4]/best',
         'outtmpl': output_path,
         'quiet': False,
         'no_warnings': False,
         'ignoreerrors': False,
+        'noprogress': True,
+        'retries': 10,
+        'fragment_retries': 10,
+        'concurrent_fragment_downloads': 8,
+        'http_chunk_size': 10 << 20,
+        'postprocessors': [],
     }
     
     try:
@@ -72,154 +217,353 @@ def download_with_ytdlp(url, output_path):
             ydl.download([url])
             
         # Verificar se o arquivo foi baixado e tem tamanho
-        if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+        if _is_nonempty(output_path):
             return True
         else:
-            print("Arquivo baixado com yt-dlp está vazio ou não existe")
+            logger.warning("Arquivo baixado com yt-dlp está vazio ou não existe")
             return False
     except Exception as e:
-        print(f"Erro com yt-dlp: {e}")
+        logger.error(f"Erro com yt-dlp: {e}")
         return False
 
-def download_with_requests(url, output_path):
+def _write_stream_mmap(response, output_path, file_size, progress):
+    """
+    Escreve o stream em um arquivo pré-alocado via mmap: o ftruncate único
+    elimina as atualizações de metadados a cada crescimento e cada bloco
+    vira uma cópia de memória para o page cache.
+    """
+    fd = os.open(output_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        os.ftruncate(fd, file_size)
+        with mmap.mmap(fd, file_size) as mm:
+            offset = 0
+            for data in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                mm[offset:offset + len(data)] = data
+                offset += len(data)
+                progress.update(len(data))
+            mm.flush()
+    finally:
+        os.close(fd)
+
+def _find_media_url(response):
+    """
+    Procura a URL do stream de mídia no HTML retornado pelo Drive.
+    Usa o parser C do selectolax sobre os bytes crus quando disponível,
+    caindo para a varredura por regex no texto decodificado quando o
+    parser não está instalado ou não encontra nada útil — em páginas
+    intersticiais a URL de videoplayback costuma estar embutida em
+    JS/JSON inline, fora de atributos href/src.
+    """
+    def _pick(candidates):
+        for candidate in candidates:
+            if candidate and ('videoplayback' in candidate or 'media' in candidate):
+                return candidate
+        return None
+
+    if HTMLParser is not None:
+        tree = HTMLParser(response.content)
+        media_url = _pick(
+            [
+                node.attributes.get('href')
+                for node in tree.css('a[href*="googleusercontent"]')
+            ] + [
+                node.attributes.get('src')
+                for node in tree.css('source[src*="googleusercontent"]')
+            ]
+        )
+        if media_url is not None:
+            return media_url
+
+    return _pick(_MEDIA_RE.findall(response.text))
+
+def download_with_requests(url, output_path, file_id=None):
     """Tenta baixar usando requests."""
-    print(f"Tentando baixar com requests: {url}")
-    
+    logger.info(f"Tentando baixar com requests: {url}")
+
     try:
-        # Extrair ID
-        file_id = extract_file_id(url)
-        
+        # Reaproveitar o ID já extraído pelo chamador
+        if file_id is None:
+            file_id = extract_file_id(url)
+
         # URL para download direto
         direct_url = f"https://drive.google.com/uc?id={file_id}&export=download"
-        
-        # Cabeçalhos para emular navegador
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Referer': 'https://drive.google.com/',
-        }
-        
-        # Sessão para manter cookies
-        session = requests.Session()
-        
-        # Primeira requisição para obter cookies
-        response = session.get(direct_url, headers=headers, stream=True)
-        
-        # Lidar com página de confirmação
-        if 'confirm=' in response.url or 'confirm=' in response.text:
-            confirm_match = re.search(r'confirm=([0-9A-Za-z_-]+)', response.url)
-            if not confirm_match:
-                confirm_match = re.search(r'confirm=([0-9A-Za-z_-]+)', response.text)
-            
-            if confirm_match:
-                confirm_token = confirm_match.group(1)
-                direct_url = f"https://drive.google.com/uc?id={file_id}&export=download&confirm={confirm_token}"
-                response = session.get(direct_url, headers=headers, stream=True)
-        
-        # Verificar se recebemos um arquivo ou HTML
-        if 'text/html' in response.headers.get('Content-Type', ''):
-            # Tentar extrair URL de mídia direta
-            media_urls = re.findall(r'https://.*?googleusercontent\.com/[^"\'&?]+', response.text)
-            media_urls = [u for u in media_urls if 'videoplayback' in u or 'media' in u]
-            
-            if media_urls:
-                print(f"URL de mídia encontrada: {media_urls[0]}")
-                response = session.get(media_urls[0], headers=headers, stream=True)
-            else:
+
+        # Sessão compartilhada do módulo (cookies + conexões keep-alive);
+        # os cabeçalhos de navegador já estão configurados nela
+        session = _SESSION
+
+        # Respeitar uma eventual janela de backoff de cota em andamento
+        _respect_quota_backoff()
+
+        # Reutilizar o token de confirmação do cache, pulando o roundtrip
+        # da página HTML de aviso
+        with _confirm_cache_lock:
+            cached_token = _confirm_cache.get(file_id)
+        if cached_token:
+            direct_url = f"{direct_url}&confirm={cached_token}"
+
+        # Caminho rápido: arquivos abaixo do limiar de verificação do
+        # Drive redirecionam direto para googleusercontent.com, sem token
+        # de confirmação. Um único HEAD resolve o redirect e dispensa o
+        # GET do HTML intersticial
+        head = session.head(direct_url, allow_redirects=True)
+
+        if 'googleusercontent.com' in head.url:
+            response = session.get(head.url, stream=True)
+        else:
+            # Primeira requisição para obter cookies
+            response = session.get(direct_url, stream=True)
+
+            if cached_token and response.status_code == 403:
+                # Token expirado: invalidar e refazer sem ele
+                with _confirm_cache_lock:
+                    _confirm_cache.pop(file_id, None)
+                direct_url = f"https://drive.google.com/uc?id={file_id}&export=download"
+                response = session.get(direct_url, stream=True)
+
+            # Detectar sinal de cota esgotada e agendar o backoff
+            if response.status_code == 429 or (
+                response.status_code == 403 and 'quota' in response.text.lower()
+            ):
+                _note_quota_hit(response)
                 return False
-        
-        # Obter tamanho do arquivo
+
+            # Lidar com página de confirmação
+            if 'confirm=' in response.url or 'confirm=' in response.text:
+                confirm_match = _CONFIRM_RE.search(response.url) or _CONFIRM_RE.search(response.text)
+
+                if confirm_match:
+                    confirm_token = confirm_match.group(1)
+                    # Guardar o token para os próximos retries deste arquivo
+                    with _confirm_cache_lock:
+                        _confirm_cache[file_id] = confirm_token
+                    direct_url = f"https://drive.google.com/uc?id={file_id}&export=download&confirm={confirm_token}"
+                    response = session.get(direct_url, stream=True)
+
+            # Verificar se recebemos um arquivo ou HTML
+            if 'text/html' in response.headers.get('Content-Type', ''):
+                # Tentar extrair URL de mídia direta
+                media_url = _find_media_url(response)
+
+                if media_url:
+                    logger.info(f"URL de mídia encontrada: {media_url}")
+                    response = session.get(media_url, stream=True)
+                else:
+                    return False
+
+        # Tamanho e suporte a ranges vêm dos cabeçalhos do stream final:
+        # no caminho do token de confirmação os bytes saem de outra URL
+        # (googleusercontent), e os cabeçalhos do HEAD em drive.google.com
+        # descrevem a página HTML intersticial, não a mídia
+        accepts_ranges = response.headers.get('Accept-Ranges', '').lower() == 'bytes'
         file_size = int(response.headers.get('content-length', 0))
         
         if file_size > 0:
-            # Exibir progresso
-            progress = tqdm(
-                response.iter_content(1024),
-                f"Baixando {os.path.basename(output_path)}",
+            # Nome exibido calculado uma única vez, fora do loop de blocos
+            display_name = os.path.basename(output_path)
+
+            # Barra de progresso com refresh limitado (mininterval) e
+            # desligada quando a saída não é um terminal (cron, CI)
+            with tqdm(
+                desc=f"Baixando {display_name}",
                 total=file_size,
                 unit="B",
                 unit_scale=True,
                 unit_divisor=1024,
-            )
-            
-            # Baixar o arquivo
-            with open(output_path, 'wb') as f:
-                for data in progress.iterable:
-                    f.write(data)
-                    progress.update(len(data))
+                mininterval=0.5,
+                disable=not sys.stderr.isatty(),
+            ) as progress:
+                if USE_MMAP:
+                    # Caminho opcional: arquivo pré-alocado + mmap
+                    _write_stream_mmap(response, output_path, file_size, progress)
+                    return _is_nonempty(output_path)
+
+                # Baixar em blocos grandes, retomando via HTTP Range se a
+                # conexão cair no meio do stream (comum em arquivos grandes
+                # do Drive), em vez de descartar os bytes já baixados.
+                # Só vale a pena tentar retomar se o servidor anunciou
+                # suporte a ranges no HEAD
+                final_url = response.url
+                bytes_written = 0
+                resume_attempts = RESUME_ATTEMPTS if accepts_ranges else 1
+                for attempt in range(resume_attempts):
+                    try:
+                        mode = 'wb' if bytes_written == 0 else 'ab'
+                        with open(output_path, mode, buffering=DOWNLOAD_CHUNK_SIZE) as f:
+                            for data in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                                f.write(data)
+                                bytes_written += len(data)
+                                progress.update(len(data))
+                        break  # stream terminou sem erro
+                    except (requests.exceptions.ChunkedEncodingError,
+                            requests.exceptions.ConnectionError,
+                            ProtocolError) as e:
+                        if bytes_written >= file_size:
+                            break
+                        wait_seconds = min(60, 2 ** attempt)
+                        logger.warning(f"Conexão interrompida ({e}), retomando do byte {bytes_written} em {wait_seconds}s...")
+                        time.sleep(wait_seconds)
+                        response = session.get(
+                            final_url, headers={'Range': f'bytes={bytes_written}-'}, stream=True
+                        )
+                        if response.status_code != 206:
+                            # Servidor não aceitou retomar; recomeçar do zero
+                            progress.reset()
+                            bytes_written = 0
+
+                # Tentativas esgotadas sem fechar o arquivo: não aceitar o
+                # parcial como sucesso (ele viraria o .mp4 final no rename)
+                if bytes_written < file_size:
+                    logger.error(
+                        f"Download incompleto ({bytes_written}/{file_size} bytes) "
+                        f"após {resume_attempts} tentativa(s) de retomada"
+                    )
+                    return False
         else:
             # Sem content-length, baixar sem progresso
             with open(output_path, 'wb') as f:
                 f.write(response.content)
         
         # Verificar se o arquivo baixado tem conteúdo
-        if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+        if _is_nonempty(output_path):
             return True
         else:
-            print("Arquivo baixado está vazio")
+            logger.warning("Arquivo baixado está vazio")
             return False
     
     except Exception as e:
-        print(f"Erro com requests: {e}")
+        logger.error(f"Erro com requests: {e}")
         return False
 
-def download_with_gdown(url, output_path):
+# Pool de processos dedicado ao gdown: isola o parse de HTML (CPU) e o
+# eventual sys.exit da biblioteca, sem travar os downloads primários
+_gdown_pool = None
+_gdown_pool_lock = threading.Lock()
+
+def _get_gdown_pool():
+    """
+    Cria (uma única vez) o pool de processos usado pelo fallback gdown.
+    O contexto é sempre spawn: fork a partir de um processo já
+    multi-thread pode herdar locks presos (a fila de logging, por
+    exemplo) e travar o filho, e forkserver reexecutaria o topo deste
+    script em cada worker. main() chama isto antes de criar as threads
+    de download, para que os processos nasçam do processo ainda limpo.
+    """
+    global _gdown_pool
+    with _gdown_pool_lock:
+        if _gdown_pool is None:
+            _gdown_pool = ProcessPoolExecutor(
+                max_workers=2,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _gdown_pool
+
+def _gdown_worker(file_id, output_path):
+    """Executa o download do gdown em um processo separado."""
+    gdown.download(id=file_id, output=os.fspath(output_path), quiet=False, fuzzy=True)
+
+def download_with_gdown(url, output_path, file_id=None):
     """Tenta baixar usando gdown."""
-    print(f"Tentando baixar com gdown: {url}")
-    
+    logger.info(f"Tentando baixar com gdown: {url}")
+
     try:
-        # Extrair ID
-        file_id = extract_file_id(url)
-        
-        # Baixar com gdown
-        gdown.download(id=file_id, output=output_path, quiet=False, fuzzy=True)
-        
+        # Reaproveitar o ID já extraído pelo chamador
+        if file_id is None:
+            file_id = extract_file_id(url)
+
+        # Baixar com gdown em um processo do pool dedicado
+        future = _get_gdown_pool().submit(_gdown_worker, file_id, output_path)
+        future.result()
+
         # Verificar se o arquivo foi baixado com sucesso
-        if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+        if _is_nonempty(output_path):
             return True
         else:
-            print("gdown não conseguiu baixar o arquivo ou o arquivo está vazio")
+            logger.warning("gdown não conseguiu baixar o arquivo ou o arquivo está vazio")
             return False
     except Exception as e:
-        print(f"Erro com gdown: {e}")
+        logger.error(f"Erro com gdown: {e}")
+        return False
+
+def _is_already_complete(file_id, output_path, session=None):
+    """
+    Verifica se o arquivo local já está completo comparando seu tamanho
+    com o Content-Length informado pelo servidor, evitando baixar de novo
+    um vídeo que já foi concluído em uma execução anterior.
+    """
+    try:
+        local_size = os.stat(output_path).st_size
+    except OSError:
+        return False
+
+    if local_size == 0:
+        return False
+
+    if session is None:
+        session = _SESSION
+
+    try:
+        response = session.head(
+            f"https://drive.google.com/uc?id={file_id}&export=download",
+            allow_redirects=True,
+        )
+        remote_size = int(response.headers.get('Content-Length', 0))
+    except Exception as e:
+        logger.error(f"Não foi possível verificar o tamanho remoto: {e}")
         return False
 
-def download_meet_video(url, output_dir=OUTPUT_DIR, index=None):
+    return remote_size > 0 and local_size == remote_size
+
+def download_meet_video(url, output_dir=OUTPUT_DIR, index=None, file_id=None):
     """Baixa um vídeo do Google Meet usando múltiplos métodos."""
     # Garantir que o diretório existe
     ensure_directory_exists(output_dir)
-    
-    # Extrair ID
-    try:
-        file_id = extract_file_id(url)
-    except ValueError as e:
-        print(f"Erro: {e}")
-        return None
-    
-    # Definir caminho de saída
+
+    # Extrair ID (se o chamador ainda não o tiver extraído)
+    if file_id is None:
+        try:
+            file_id = extract_file_id(url)
+        except ValueError as e:
+            logger.error(f"Erro: {e}")
+            return None
+
+    # Definir caminho de saída como um único objeto Path reutilizado
     filename = generate_filename(file_id, index)
-    output_path = os.path.join(output_dir, filename)
-    print(f"Baixando para: {output_path}")
-    
+    output_path = Path(output_dir) / filename
+
+    # Pular arquivos já baixados por completo em execuções anteriores
+    if _is_already_complete(file_id, output_path):
+        logger.info(f"Arquivo já baixado e completo, pulando: {output_path}")
+        return output_path
+
+    logger.info(f"Baixando para: {output_path}")
+
+    # Baixar para um arquivo .part e só mover para o nome final no
+    # sucesso: um download abortado não deixa um .mp4 truncado que as
+    # verificações de existência/tamanho confundiriam com completo
+    tmp_path = output_path.parent / (output_path.name + '.part')
+
     # Tentar diferentes métodos de download
-    if download_with_ytdlp(url, output_path):
-        print("Download bem-sucedido com yt-dlp!")
+    if download_with_ytdlp(url, str(tmp_path)):
+        os.replace(tmp_path, output_path)
+        logger.info("Download bem-sucedido com yt-dlp!")
         return output_path
-    
-    print("yt-dlp falhou, tentando método alternativo...")
-    
-    if download_with_requests(url, output_path):
-        print("Download bem-sucedido com requests!")
+
+    logger.info("yt-dlp falhou, tentando método alternativo...")
+
+    if download_with_requests(url, tmp_path, file_id):
+        os.replace(tmp_path, output_path)
+        logger.info("Download bem-sucedido com requests!")
         return output_path
-    
-    print("requests falhou, tentando gdown...")
-    
-    if download_with_gdown(url, output_path):
-        print("Download bem-sucedido com gdown!")
+
+    logger.info("requests falhou, tentando gdown...")
+
+    if download_with_gdown(url, tmp_path, file_id):
+        os.replace(tmp_path, output_path)
+        logger.info("Download bem-sucedido com gdown!")
         return output_path
-    
-    print("Todos os métodos de download falharam.")
+
+    logger.error("Todos os métodos de download falharam.")
     return None
 
 def read_urls_from_file(file_path=URL_FILE):
@@ -229,64 +573,98 @@ def read_urls_from_file(file_path=URL_FILE):
         with open(file_path, "w") as f:
             f.write("https://drive.google.com/file/d/1DTwXm5jdHZoI2V2E8zkKWb78IjAPEkaL/view?t=3\n")
             f.write("# Adicione mais URLs abaixo (uma por linha)\n")
-        print(f"Arquivo {file_path} criado. Adicione as URLs dos vídeos (uma por linha) e execute novamente.")
+        logger.info(f"Arquivo {file_path} criado. Adicione as URLs dos vídeos (uma por linha) e execute novamente.")
         return []
     
     # Ler URLs do arquivo
     with open(file_path, "r") as f:
         urls = f.read().splitlines()
-    
+
     # Filtrar comentários e linhas em branco
     valid_urls = [url.strip() for url in urls if url.strip() and not url.strip().startswith('#')]
-    
-    return valid_urls
+
+    # Descartar URLs inválidas e deduplicar pelo ID do arquivo (usuários
+    # costumam colar a mesma URL mais de uma vez ao anexar no urls.txt),
+    # preservando a ordem original
+    seen_ids = set()
+    unique_urls = []
+    for url in valid_urls:
+        try:
+            file_id = extract_file_id(url)
+        except ValueError:
+            logger.warning(f"URL inválida ignorada: {url}")
+            continue
+
+        if file_id in seen_ids:
+            logger.warning(f"URL duplicada ignorada (mesmo arquivo): {url}")
+            continue
+
+        seen_ids.add(file_id)
+        unique_urls.append((file_id, url))
+
+    return unique_urls
 
 def download_all_videos():
-    """Baixa todos os vídeos listados no arquivo de URLs."""
+    """
+    Baixa todos os vídeos listados no arquivo de URLs.
+    Os downloads são independentes entre si e limitados por I/O de rede,
+    então rodam em paralelo (até MAX_CONCURRENT_DOWNLOADS por vez) em vez
+    de um por vez com espera fixa entre eles.
+    """
     urls = read_urls_from_file()
-    
+
     if not urls:
-        print(f"Nenhuma URL encontrada em {URL_FILE}. Adicione URLs (uma por linha) e execute novamente.")
+        logger.warning(f"Nenhuma URL encontrada em {URL_FILE}. Adicione URLs (uma por linha) e execute novamente.")
         return
-    
-    print(f"Iniciando download de {len(urls)} vídeo(s)...")
-    
+
+    logger.info(f"Iniciando download de {len(urls)} vídeo(s)...")
+
     successful_downloads = []
-    
-    for i, url in enumerate(urls):
-        print(f"\n[{i+1}/{len(urls)}] Processando: {url}")
-        result = download_meet_video(url, OUTPUT_DIR, i+1)
-        
-        if result:
-            successful_downloads.append(result)
-            print(f"Download concluído: {result}")
-            
-            # Aguardar entre downloads se houver mais vídeos e mais de um na lista
-            if i < len(urls) - 1 and len(urls) > 1:
-                wait_between_downloads()
-        else:
-            print(f"Falha ao baixar: {url}")
-    
+
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_DOWNLOADS) as executor:
+        future_to_url = {
+            executor.submit(download_meet_video, url, OUTPUT_DIR, i + 1, file_id): url
+            for i, (file_id, url) in enumerate(urls)
+        }
+
+        for future in as_completed(future_to_url):
+            url = future_to_url[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"Erro ao baixar {url}: {e}")
+                result = None
+
+            if result:
+                successful_downloads.append(result)
+                logger.info(f"Download concluído: {result}")
+            else:
+                logger.error(f"Falha ao baixar: {url}")
+
     total_success = len(successful_downloads)
-    print(f"\nDownloads concluídos: {total_success}/{len(urls)}")
+    logger.info(f"Downloads concluídos: {total_success}/{len(urls)}")
     
     if total_success > 0:
-        print("\nArquivos baixados:")
+        logger.info("Arquivos baixados:")
         for file_path in successful_downloads:
-            print(f"- {file_path}")
+            logger.info(f"- {file_path}")
 
 def main():
     """Função principal."""
+    # Criar o pool do gdown já no startup, enquanto o processo só tem a
+    # thread principal (ver _get_gdown_pool)
+    _get_gdown_pool()
+
     if len(sys.argv) > 1:
         # Se for fornecida uma URL como argumento
         url = sys.argv[1]
         result = download_meet_video(url)
         
         if result:
-            print(f"Download concluído! Arquivo salvo em: {result}")
+            logger.info(f"Download concluído! Arquivo salvo em: {result}")
             return 0
         else:
-            print("Falha no download.")
+            logger.error("Falha no download.")
             return 1
     else:
         # Sem argumentos, baixar todos os vídeos do arquivo
@@ -4,18 +4,49 @@ DownMeets - Ferramenta para download, transcrição e resumo de vídeos do Googl
 """
 
 import os
+import re
 import sys
 import json
+import mmap
+import time
+import uuid
+import hashlib
+import types
+import atexit
+import random
+import asyncio
+import functools
+import importlib
 import logging
 import argparse
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 import dotenv
 from dotenv import load_dotenv
 
-from core import download, transcribe, summarize, utils
+from core import utils
+
+
+@functools.lru_cache(maxsize=None)
+def _core(name: str):
+    """
+    Importa um submódulo pesado de core sob demanda (uma vez por processo).
+    download/transcribe/summarize puxam requests, tqdm e o SDK da OpenAI;
+    adiar o import deixa o --help e os modos que não usam esses módulos
+    centenas de ms mais rápidos na partida.
+    """
+    return importlib.import_module(f"core.{name}")
+
+
+# Serialização JSON acelerada (opcional): quando instalado, o orjson é
+# bem mais rápido que o json da stdlib no parse/dump dos metadados
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 # Configuração básica de logging
@@ -26,11 +57,134 @@ logging.basicConfig(
 )
 logger = logging.getLogger("DownMeets")
 
+# Extração do file_id de nomes como video_<id>_<timestamp>.mp4, compilada
+# uma única vez no load do módulo
+_VIDEO_NAME_RE = re.compile(r"^video_([^_.]+)")
+_TRANS_NAME_RE = re.compile(r"^transcription_([^_.]+)")
 
-def load_config() -> Dict:
-    """Carrega as configurações do arquivo .env"""
+# Quantidade de itens processados simultaneamente nos modos em lote
+MAX_CONCURRENCY = int(os.getenv("MAX_CONCURRENCY", "4"))
+
+# Protege as gravações concorrentes do arquivo de metadados
+_metadata_lock = threading.Lock()
+
+
+class _TokenBucket:
+    """
+    Limitador de taxa por balde de tokens, compartilhado entre os workers.
+    Gera um token a cada intervalo, acumulando até o limite de burst nos
+    períodos ociosos — itens que terminam rápido em sequência não pagam a
+    espera cheia, ao contrário do sleep fixo do antigo wait_between_items,
+    mas a taxa média continua limitada.
+    """
+
+    def __init__(self, interval_seconds: float, burst: int = 1):
+        self._interval = interval_seconds
+        self._burst = max(1, burst)
+        self._tokens = float(self._burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self._interval <= 0:
+            return
+
+        while True:
+            async with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    float(self._burst),
+                    self._tokens + (now - self._updated) / self._interval,
+                )
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait_seconds = (1.0 - self._tokens) * self._interval
+
+            await asyncio.sleep(wait_seconds)
+
+
+def _is_transient_error(exc: Exception) -> bool:
+    """Identifica erros transitórios (limite de taxa/5xx) que valem nova tentativa."""
+    # Cobre openai.RateLimitError e httpx.HTTPStatusError sem importar
+    # as bibliotecas aqui: ambos expõem response.status_code
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    if status in (429, 500, 502, 503, 504):
+        return True
+
+    message = str(exc).lower()
+    return "rate limit" in message or "quota" in message
+
+
+def _with_retry(fn: Callable, *args, attempts: int = 3, base: float = 2.0, cap: float = 30.0, **kwargs):
+    """
+    Executa uma chamada de I/O externo (Drive/OpenAI), repetindo com
+    backoff exponencial quando o erro é transitório. Evita que um único
+    HTTP 429 no meio do lote derrube o pipeline daquela URL.
+
+    As funções do core capturam as próprias exceções e sinalizam falha
+    com False/None, então um retorno falso também conta como tentativa
+    fracassada e entra no mesmo backoff; na última tentativa o valor
+    falso é devolvido ao chamador.
+    """
+    for attempt in range(attempts):
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if attempt == attempts - 1 or not _is_transient_error(e):
+                raise
+            wait_seconds = min(cap, base * 2 ** attempt) + random.uniform(0, 1)
+            logger.warning(f"Erro transitório ({e}), nova tentativa em {wait_seconds:.1f}s...")
+            time.sleep(wait_seconds)
+            continue
+
+        if result or attempt == attempts - 1:
+            return result
+        wait_seconds = min(cap, base * 2 ** attempt) + random.uniform(0, 1)
+        logger.warning(f"Chamada falhou sem resultado, nova tentativa em {wait_seconds:.1f}s...")
+        time.sleep(wait_seconds)
+
+
+def process_batch(
+    items: List[str],
+    worker: Callable[[str], Optional[str]],
+    delay_minutes: int,
+    label: str
+) -> List[Optional[str]]:
+    """
+    Processa uma lista de itens concorrentemente, limitado por MAX_CONCURRENCY.
+    Cada etapa do pipeline é dominada por I/O de rede (Drive/OpenAI), então
+    rodar os itens em paralelo dá um ganho quase linear no modo lote. O
+    worker bloqueante roda em thread via asyncio.to_thread.
+    """
+    async def _run() -> List[Optional[str]]:
+        semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+        limiter = _TokenBucket(delay_minutes * 60, burst=MAX_CONCURRENCY)
+        total = len(items)
+
+        async def _one(index: int, item: str) -> Optional[str]:
+            async with semaphore:
+                await limiter.acquire()
+                logger.info("[%s/%s] %s: %s", index, total, label, item)
+                return await asyncio.to_thread(worker, item)
+
+        return await asyncio.gather(*(
+            _one(i + 1, item) for i, item in enumerate(items)
+        ))
+
+    return asyncio.run(_run())
+
+
+@functools.lru_cache(maxsize=1)
+def _load_config_raw() -> "types.MappingProxyType":
+    """
+    Parse memoizado do .env: o arquivo é lido e as variáveis coagidas uma
+    única vez por processo, mesmo com chamadas repetidas a load_config.
+    Retorna uma visão imutável para o cache não ser mutado por engano.
+    """
     load_dotenv()
-    
+
     # Configurações obrigatórias com valores padrão
     config = {
         "URL_FILE": os.getenv("URL_FILE", "urls.txt"),
@@ -51,46 +205,217 @@ def load_config() -> Dict:
     if not api_key:
         logger.warning("OPENAI_API_KEY não definida no .env, transcrição e resumo podem falhar.")
     config["OPENAI_API_KEY"] = api_key
-    
+
+    return types.MappingProxyType(config)
+
+
+def load_config() -> Dict:
+    """
+    Carrega as configurações do arquivo .env.
+    Devolve uma cópia mutável do cache, para o chamador poder sobrescrever
+    valores (ex: a chave da API vinda da linha de comando).
+    """
+    config = dict(_load_config_raw())
+
+    # Diretórios de saída pré-resolvidos como Path: montar caminhos vira
+    # um único "/" por arquivo, sem o os.path.join reprocessar separadores
+    config["_video_dir"] = Path(config["VIDEO_OUTPUT_DIR"])
+    config["_transcription_dir"] = Path(config["TRANSCRIPTION_OUTPUT_DIR"])
+    config["_summary_dir"] = Path(config["SUMMARY_OUTPUT_DIR"])
+
     return config
 
 
 def ensure_output_directories(config: Dict) -> None:
     """Garante que os diretórios de saída existam"""
-    Path(config["VIDEO_OUTPUT_DIR"]).mkdir(parents=True, exist_ok=True)
-    Path(config["TRANSCRIPTION_OUTPUT_DIR"]).mkdir(parents=True, exist_ok=True)
-    Path(config["SUMMARY_OUTPUT_DIR"]).mkdir(parents=True, exist_ok=True)
+    # Criar o pai comum primeiro, para os mkdir abaixo não re-statarem
+    # toda a cadeia de ancestrais; diretórios repetidos na configuração
+    # só são criados uma vez
+    Path("output").mkdir(exist_ok=True)
+
+    seen = set()
+    for directory in (
+        config["VIDEO_OUTPUT_DIR"],
+        config["TRANSCRIPTION_OUTPUT_DIR"],
+        config["SUMMARY_OUTPUT_DIR"],
+    ):
+        if directory in seen:
+            continue
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        seen.add(directory)
+
+
+# Cache negativo de caminhos sabidamente ausentes, persistido entre
+# execuções: entradas obsoletas nos metadados (arquivos apagados) custam
+# um stat inútil por execução, e crescem sem limite com o tempo
+_MISSING_PATHS_FILE = Path("output/.missing.json")
+_missing_paths_lock = threading.Lock()
+_missing_paths = set()
+
+try:
+    with open(_MISSING_PATHS_FILE, "r", encoding="utf-8") as _f:
+        _missing_paths = set(json.load(_f))
+except (OSError, ValueError):
+    pass
+
+
+def _save_missing_paths() -> None:
+    """Persiste o cache negativo de caminhos ausentes no encerramento"""
+    with _missing_paths_lock:
+        if not _missing_paths:
+            return
+        try:
+            _MISSING_PATHS_FILE.parent.mkdir(parents=True, exist_ok=True)
+            with open(_MISSING_PATHS_FILE, "w", encoding="utf-8") as f:
+                json.dump(sorted(_missing_paths), f)
+        except OSError:
+            pass
+
+
+atexit.register(_save_missing_paths)
+
+
+def _note_path_written(path: str) -> None:
+    """Remove um caminho recém-gravado do cache negativo"""
+    with _missing_paths_lock:
+        _missing_paths.discard(path)
+
+
+@functools.lru_cache(maxsize=4096)
+def _exists(path: str) -> bool:
+    """
+    os.path.exists com cache por execução: os modos combinados consultam
+    os mesmos caminhos de vídeo/transcrição/resumo várias vezes, e cada
+    consulta repetida vira um stat desnecessário. O cache é invalidado em
+    save_metadata, quando novos caminhos podem ter sido gravados.
+    """
+    return os.path.exists(path)
+
+
+# Cache do dicionário de metadados: carregado uma única vez por execução
+# e gravado de forma adiada/agrupada, em vez de um json.dump completo a
+# cada etapa de cada URL
+_metadata_cache: Optional[Dict] = None
+_metadata_dirty = False
+_metadata_mutations = 0
+
+# A cada quantas mutações os metadados são descarregados em disco
+_METADATA_FLUSH_EVERY = 16
 
 
 def load_metadata() -> Dict:
-    """Carrega os metadados existentes ou cria um novo arquivo"""
+    """Carrega os metadados existentes (uma vez por execução) ou cria um novo arquivo"""
+    global _metadata_cache
+
+    if _metadata_cache is not None:
+        return _metadata_cache
+
     metadata_path = Path("output/metadata.json")
-    
+
     if metadata_path.exists():
         try:
-            with open(metadata_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except json.JSONDecodeError:
+            with open(metadata_path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size > 65536:
+                    # Arquivos grandes: mapear em memória dispensa a cópia
+                    # pelo buffer de leitura do Python
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        raw = bytes(mm)
+                else:
+                    raw = f.read()
+            _metadata_cache = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        except ValueError:
             logger.warning("Arquivo de metadados corrompido. Criando novo.")
-            return {}
+            _metadata_cache = {}
     else:
         # Garantir que o diretório output exista
         metadata_path.parent.mkdir(parents=True, exist_ok=True)
-        return {}
+        _metadata_cache = {}
+
+    return _metadata_cache
+
+
+# Hash do último dump gravado: flushes com conteúdo byte a byte idêntico
+# (comum quando um retry regrava o mesmo registro) são descartados
+_last_metadata_digest = b""
+
+
+def flush_metadata() -> None:
+    """Grava os metadados em disco, se houver alterações pendentes"""
+    global _metadata_dirty, _last_metadata_digest
+
+    with _metadata_lock:
+        if not _metadata_dirty or _metadata_cache is None:
+            return
+
+        if orjson is not None:
+            data = orjson.dumps(_metadata_cache, option=orjson.OPT_INDENT_2)
+        else:
+            data = json.dumps(_metadata_cache, indent=2, ensure_ascii=False).encode("utf-8")
+
+        # Conteúdo idêntico ao que já está em disco: pular a escrita/fsync
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        if digest == _last_metadata_digest:
+            _metadata_dirty = False
+            return
+
+        # Escrita atômica: gravar num .tmp e renomear por cima, para uma
+        # queda no meio do dump não corromper o arquivo (o que forçaria
+        # re-downloads ao perder o estado) e leitores concorrentes nunca
+        # verem um JSON parcial
+        metadata_path = Path("output/metadata.json")
+        tmp_path = metadata_path.with_suffix(".json.tmp")
+
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp_path, metadata_path)
+        _last_metadata_digest = digest
+        _metadata_dirty = False
+
+
+# Garantir que alterações pendentes não se percam no encerramento
+atexit.register(flush_metadata)
 
 
 def save_metadata(metadata: Dict) -> None:
-    """Salva os metadados no arquivo"""
-    metadata_path = Path("output/metadata.json")
-    
-    with open(metadata_path, "w", encoding="utf-8") as f:
-        json.dump(metadata, f, indent=2, ensure_ascii=False)
+    """
+    Marca os metadados como alterados. A gravação real é adiada: ocorre a
+    cada _METADATA_FLUSH_EVERY mutações e no encerramento do processo,
+    reduzindo as reescritas do arquivo de O(etapas × URLs) para O(1).
+
+    Só opera sobre o singleton devolvido por load_metadata(): o flush
+    serializa _metadata_cache, então um dict qualquer passado aqui seria
+    descartado em silêncio — melhor falhar alto do que perder estado.
+    """
+    global _metadata_dirty, _metadata_mutations
+
+    assert metadata is _metadata_cache, (
+        "save_metadata só aceita o dicionário devolvido por load_metadata()"
+    )
+
+    with _metadata_lock:
+        _metadata_dirty = True
+        _metadata_mutations += 1
+        pending_flush = _metadata_mutations % _METADATA_FLUSH_EVERY == 0
+
+    # Mutação nos metadados implica possíveis caminhos novos em disco
+    _exists.cache_clear()
+
+    if pending_flush:
+        flush_metadata()
 
 
 def process_url(url: str, config: Dict, metadata: Dict, mode: str = "all") -> Optional[str]:
     """
     Processa uma URL: baixa, transcreve e resume conforme configuração e modo.
-    
+
+    As três etapas compartilham a resolução de caminhos, a checagem de
+    resultado já existente e a busca da chave da API; os metadados são
+    gravados uma única vez ao final, em vez de uma vez por etapa.
+
     Modos:
     - 'all': Executa todas as etapas habilitadas no config
     - 'download': Apenas faz o download
@@ -99,129 +424,185 @@ def process_url(url: str, config: Dict, metadata: Dict, mode: str = "all") -> Op
     """
     try:
         # Extrair ID da URL para identificação nos metadados
-        file_id = download.extract_file_id(url)
+        file_id = _core("download").extract_file_id(url)
         key = f"meet_{file_id}"
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # Inicializar entrada nos metadados se não existir
-        if key not in metadata:
-            metadata[key] = {
-                "url": url,
-                "file_id": file_id,
-                "created_at": datetime.now().isoformat()
-            }
-        
-        # Etapa 1: Download do vídeo
-        video_path = None
-        if mode == "all" and config["ENABLE_DOWNLOAD"] or mode == "download":
+        # Um único datetime.now() por item: evita reformatar a cada etapa
+        # e mantém os timestamps consistentes entre os campos do registro
+        now = datetime.now()
+        now_iso = now.isoformat()
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
+
+        # Inicializar entrada nos metadados se não existir. Toda mutação
+        # no dicionário compartilhado precisa do _metadata_lock: o flush
+        # serializa o cache sob esse lock e um insert concorrente de outra
+        # thread do lote quebraria a iteração do json.dumps
+        with _metadata_lock:
+            if key not in metadata:
+                metadata[key] = {
+                    "url": url,
+                    "file_id": file_id,
+                    "created_at": now_iso
+                }
+
+            entry = metadata[key]
+        # Caminhos produzidos pelas etapas anteriores nesta execução
+        state = {"video_path": None, "transcription_path": None}
+        changed = False
+
+        def _get_api_key() -> Optional[str]:
+            api_key = config.get("OPENAI_API_KEY")
+            if not api_key:
+                logger.error("Chave da API OpenAI não encontrada. Utilize o argumento --api-key para fornecê-la.")
+            return api_key
+
+        def _resolve_video() -> bool:
+            # Sem download nesta execução: usar o caminho dos metadados
+            video_path = entry.get("video_path")
+            if video_path is None:
+                logger.error("Vídeo não encontrado nos metadados e download não está habilitado.")
+                return False
+            if not _exists(video_path):
+                with _missing_paths_lock:
+                    _missing_paths.add(video_path)
+                logger.error(f"Vídeo não encontrado no caminho: {video_path}")
+                return False
+            state["video_path"] = video_path
+            return True
+
+        def _do_download() -> bool:
+            nonlocal changed
+            # Curto-circuito: se o vídeo de uma execução anterior ainda está
+            # em disco com o tamanho registrado, não baixar tudo de novo
+            cached_path = entry.get("video_path")
+            if (
+                cached_path and _exists(cached_path) and
+                os.path.getsize(cached_path) == entry.get("video_bytes", -1)
+            ):
+                logger.info("Vídeo já baixado, reaproveitando: %s", cached_path)
+                state["video_path"] = cached_path
+                return True
+
             video_filename = f"video_{file_id}_{timestamp}.mp4"
-            video_path = os.path.join(config["VIDEO_OUTPUT_DIR"], video_filename)
-            
-            logger.info(f"Baixando vídeo: {url}")
-            success = download.download_meet_video(url, video_path)
-            
-            if success:
-                metadata[key]["video_path"] = video_path
-                metadata[key]["download_date"] = datetime.now().isoformat()
-                save_metadata(metadata)
-                logger.info(f"Vídeo baixado com sucesso: {video_path}")
-            else:
+            video_path = str(config["_video_dir"] / video_filename)
+
+            logger.info("Baixando vídeo: %s", url)
+            if not _with_retry(_core("download").download_meet_video, url, video_path):
                 logger.error(f"Falha ao baixar vídeo: {url}")
-                if mode == "download":
-                    return None
-        else:
-            # Se não estamos fazendo download, usar o caminho do vídeo dos metadados
-            if "video_path" in metadata[key]:
-                video_path = metadata[key]["video_path"]
-                if not os.path.exists(video_path):
-                    logger.error(f"Vídeo não encontrado no caminho: {video_path}")
-                    if mode in ["all", "transcribe"]:
-                        return None
-            elif mode in ["all", "transcribe"]:
-                logger.error("Vídeo não encontrado nos metadados e download não está habilitado.")
-                return None
-        
-        # Etapa 2: Transcrição do vídeo
-        transcription_path = None
-        if (mode == "all" and config["ENABLE_TRANSCRIPTION"] or mode == "transcribe") and video_path:
-            # Verificar se já foi transcrito
-            if "transcription_path" in metadata[key] and os.path.exists(metadata[key]["transcription_path"]):
-                logger.info(f"Transcrição já existente: {metadata[key]['transcription_path']}")
-                transcription_path = metadata[key]["transcription_path"]
-            else:
-                transcription_filename = f"transcription_{file_id}_{timestamp}.txt"
-                transcription_path = os.path.join(config["TRANSCRIPTION_OUTPUT_DIR"], transcription_filename)
-                
-                # Obter a chave da API (garantir que exista)
-                api_key = config.get("OPENAI_API_KEY")
-                if not api_key:
-                    logger.error("Chave da API OpenAI não encontrada. Utilize o argumento --api-key para fornecê-la.")
-                    if mode == "transcribe":
-                        return None
-                
-                logger.info(f"Transcrevendo vídeo: {video_path}")
-                success = transcribe.transcribe_video(
-                    video_path=video_path,
-                    output_path=transcription_path,
-                    model=config["TRANSCRIPTION_MODEL"],
-                    api_key=api_key
-                )
-                
-                if success:
-                    metadata[key]["transcription_path"] = transcription_path
-                    metadata[key]["transcription_date"] = datetime.now().isoformat()
-                    save_metadata(metadata)
-                    logger.info(f"Transcrição concluída: {transcription_path}")
-                else:
-                    logger.error(f"Falha ao transcrever vídeo: {video_path}")
-                    if mode == "transcribe":
-                        return None
-        elif mode == "summarize" or (mode == "all" and config["ENABLE_SUMMARY"]):
+                return False
+
+            with _metadata_lock:
+                entry["video_path"] = video_path
+                entry["video_bytes"] = os.path.getsize(video_path)
+                entry["download_date"] = now_iso
+            _note_path_written(video_path)
+            state["video_path"] = video_path
+            changed = True
+            logger.info("Vídeo baixado com sucesso: %s", video_path)
+            return True
+
+        def _do_transcribe() -> bool:
+            nonlocal changed
+            existing = entry.get("transcription_path")
+            if existing and _exists(existing):
+                logger.info("Transcrição já existente: %s", existing)
+                state["transcription_path"] = existing
+                return True
+
+            if state["video_path"] is None and not _resolve_video():
+                return False
+
+            api_key = _get_api_key()
+            if not api_key:
+                return False
+
+            transcription_filename = f"transcription_{file_id}_{timestamp}.txt"
+            transcription_path = str(config["_transcription_dir"] / transcription_filename)
+
+            logger.info("Transcrevendo vídeo: %s", state['video_path'])
+            success = _with_retry(
+                _core("transcribe").transcribe_video,
+                video_path=state["video_path"],
+                output_path=transcription_path,
+                model=config["TRANSCRIPTION_MODEL"],
+                api_key=api_key
+            )
+            if not success:
+                logger.error(f"Falha ao transcrever vídeo: {state['video_path']}")
+                return False
+
+            with _metadata_lock:
+                entry["transcription_path"] = transcription_path
+                entry["transcription_date"] = now_iso
+            _note_path_written(transcription_path)
+            state["transcription_path"] = transcription_path
+            changed = True
+            logger.info("Transcrição concluída: %s", transcription_path)
+            return True
+
+        def _do_summarize() -> bool:
+            nonlocal changed
+            existing = entry.get("summary_path")
+            if existing and _exists(existing):
+                logger.info("Resumo já existente: %s", existing)
+                return True
+
             # Para resumo, precisamos apenas da transcrição
-            if "transcription_path" in metadata[key] and os.path.exists(metadata[key]["transcription_path"]):
-                transcription_path = metadata[key]["transcription_path"]
-            else:
-                logger.error("Nenhuma transcrição encontrada para este vídeo.")
-                if mode == "summarize":
-                    return None
-        
-        # Etapa 3: Resumo da transcrição
-        if (mode == "all" and config["ENABLE_SUMMARY"] or mode == "summarize") and transcription_path:
-            # Verificar se já foi resumido
-            if "summary_path" in metadata[key] and os.path.exists(metadata[key]["summary_path"]):
-                logger.info(f"Resumo já existente: {metadata[key]['summary_path']}")
-            else:
-                summary_filename = f"summary_{file_id}_{timestamp}.md"
-                summary_path = os.path.join(config["SUMMARY_OUTPUT_DIR"], summary_filename)
-                
-                # Obter a chave da API (garantir que exista)
-                api_key = config.get("OPENAI_API_KEY")
-                if not api_key:
-                    logger.error("Chave da API OpenAI não encontrada. Utilize o argumento --api-key para fornecê-la.")
-                    if mode == "summarize":
-                        return None
-                
-                logger.info(f"Gerando resumo da transcrição: {transcription_path}")
-                success = summarize.generate_summary(
-                    transcription_path=transcription_path,
-                    output_path=summary_path,
-                    model=config["SUMMARY_MODEL"],
-                    language=config["SUMMARY_LANGUAGE"],
-                    api_key=api_key
-                )
-                
-                if success:
-                    metadata[key]["summary_path"] = summary_path
-                    metadata[key]["summary_date"] = datetime.now().isoformat()
-                    save_metadata(metadata)
-                    logger.info(f"Resumo concluído: {summary_path}")
+            transcription_path = state["transcription_path"]
+            if transcription_path is None:
+                stored = entry.get("transcription_path")
+                if stored and _exists(stored):
+                    transcription_path = stored
                 else:
-                    logger.error(f"Falha ao gerar resumo da transcrição: {transcription_path}")
-                    if mode == "summarize":
-                        return None
-        
-        return key
-    
+                    logger.error("Nenhuma transcrição encontrada para este vídeo.")
+                    return False
+
+            api_key = _get_api_key()
+            if not api_key:
+                return False
+
+            summary_filename = f"summary_{file_id}_{timestamp}.md"
+            summary_path = str(config["_summary_dir"] / summary_filename)
+
+            logger.info("Gerando resumo da transcrição: %s", transcription_path)
+            success = _with_retry(
+                _core("summarize").generate_summary,
+                transcription_path=transcription_path,
+                output_path=summary_path,
+                model=config["SUMMARY_MODEL"],
+                language=config["SUMMARY_LANGUAGE"],
+                api_key=api_key
+            )
+            if not success:
+                logger.error(f"Falha ao gerar resumo da transcrição: {transcription_path}")
+                return False
+
+            with _metadata_lock:
+                entry["summary_path"] = summary_path
+                entry["summary_date"] = now_iso
+            _note_path_written(summary_path)
+            changed = True
+            logger.info("Resumo concluído: %s", summary_path)
+            return True
+
+        stages = [
+            ("download", config["ENABLE_DOWNLOAD"], _do_download),
+            ("transcribe", config["ENABLE_TRANSCRIPTION"], _do_transcribe),
+            ("summarize", config["ENABLE_SUMMARY"], _do_summarize),
+        ]
+
+        result = key
+        for stage_name, enabled, runner in stages:
+            if not ((mode == "all" and enabled) or mode == stage_name):
+                continue
+            if not runner() and mode == stage_name:
+                result = None
+                break
+
+        if changed:
+            save_metadata(metadata)
+
+        return result
+
     except Exception as e:
         logger.exception(f"Erro ao processar URL {url}: {str(e)}")
         return None
@@ -237,85 +618,121 @@ def read_urls(config: Dict) -> List[str]:
             f.write("# Adicione URLs de vídeos do Google Meet (uma por linha)\n")
         return []
     
-    with open(url_file, "r", encoding="utf-8") as f:
-        lines = f.readlines()
-    
-    # Filtrar comentários e linhas vazias
-    urls = [line.strip() for line in lines if line.strip() and not line.strip().startswith("#")]
+    # Uma passada só, com um único strip por linha, sem materializar o
+    # arquivo inteiro com readlines
+    with open(url_file, "r", encoding="utf-8", buffering=1 << 20) as f:
+        urls = [
+            stripped for stripped in (line.strip() for line in f)
+            if stripped and stripped[0] != "#"
+        ]
     return urls
 
 
-def find_all_videos() -> List[str]:
-    """Encontra todos os caminhos de vídeos nos metadados"""
-    metadata = load_metadata()
-    videos = []
-    
-    for key, data in metadata.items():
-        if "video_path" in data and os.path.exists(data["video_path"]):
-            videos.append(data["video_path"])
-    
-    return videos
+def _find_existing_paths(metadata: Dict, field: str, directory: str) -> List[str]:
+    """
+    Coleta os caminhos do campo indicado nos metadados que existem em disco.
+    Um único os.scandir lista o diretório de saída inteiro (um getdents em
+    vez de um stat por entrada); só caminhos fora do diretório varrido
+    (configuração antiga) caem no caminho lento com cache.
+    """
+    try:
+        present = {entry.path for entry in os.scandir(directory) if entry.is_file()}
+    except OSError:
+        present = set()
 
+    found = []
+    for data in metadata.values():
+        path = data.get(field)
+        if not path:
+            continue
+        if path in present:
+            found.append(path)
+        elif os.path.dirname(path) == directory.rstrip("/"):
+            # Dentro do diretório varrido e ausente da listagem
+            with _missing_paths_lock:
+                _missing_paths.add(path)
+        elif path not in _missing_paths:
+            if _exists(path):
+                found.append(path)
+            else:
+                with _missing_paths_lock:
+                    _missing_paths.add(path)
+
+    return found
 
-def find_all_transcriptions() -> List[str]:
-    """Encontra todos os caminhos de transcrições nos metadados"""
-    metadata = load_metadata()
-    transcriptions = []
-    
-    for key, data in metadata.items():
-        if "transcription_path" in data and os.path.exists(data["transcription_path"]):
-            transcriptions.append(data["transcription_path"])
-    
-    return transcriptions
 
+def find_all_videos(metadata: Dict, video_dir: str) -> List[str]:
+    """Encontra todos os caminhos de vídeos nos metadados já carregados"""
+    return _find_existing_paths(metadata, "video_path", video_dir)
 
-def process_single_video(video_path: str, config: Dict, metadata: Dict, mode: str) -> Optional[str]:
+
+def find_all_transcriptions(metadata: Dict, transcription_dir: str) -> List[str]:
+    """Encontra todos os caminhos de transcrições nos metadados já carregados"""
+    return _find_existing_paths(metadata, "transcription_path", transcription_dir)
+
+
+def _build_path_indexes(metadata: Dict) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    Constrói índices reversos caminho→chave dos metadados, para substituir
+    as varreduras lineares por consultas O(1) nos process_single_*.
+    """
+    video_index = {
+        data["video_path"]: key
+        for key, data in metadata.items() if "video_path" in data
+    }
+    transcription_index = {
+        data["transcription_path"]: key
+        for key, data in metadata.items() if "transcription_path" in data
+    }
+    return video_index, transcription_index
+
+
+def process_single_video(
+    video_path: str,
+    config: Dict,
+    metadata: Dict,
+    mode: str,
+    video_index: Dict[str, str]
+) -> Optional[str]:
     """Processa um único vídeo já baixado para transcrição ou resumo"""
     try:
-        # Tentar encontrar o vídeo nos metadados
-        found_key = None
-        for key, data in metadata.items():
-            if "video_path" in data and data["video_path"] == video_path:
-                found_key = key
-                break
-        
+        # Um único datetime.now() por item (mesma razão de process_url)
+        now = datetime.now()
+        now_iso = now.isoformat()
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
+
+        # Consulta O(1) no índice reverso caminho→chave
+        found_key = video_index.get(video_path)
+
         if not found_key:
             # Vídeo não está nos metadados, adicioná-lo
             file_name = os.path.basename(video_path)
-            # Tentar extrair ID do nome do arquivo
-            if file_name.startswith("video_"):
-                parts = file_name.split("_")
-                if len(parts) >= 2:
-                    file_id = parts[1].split(".")[0]
-                    key = f"meet_{file_id}"
-                else:
-                    # Gerar ID aleatório
-                    import uuid
-                    file_id = str(uuid.uuid4())[:8]
-                    key = f"meet_{file_id}"
-            else:
-                # Gerar ID aleatório
-                import uuid
-                file_id = str(uuid.uuid4())[:8]
-                key = f"meet_{file_id}"
+            # Extrair o ID com a regex pré-compilada; nomes fora do padrão
+            # recebem um ID aleatório
+            match = _VIDEO_NAME_RE.match(file_name)
+            file_id = match.group(1) if match else uuid.uuid4().hex[:8]
+            key = f"meet_{file_id}"
             
-            metadata[key] = {
-                "file_id": file_id,
-                "video_path": video_path,
-                "created_at": datetime.now().isoformat(),
-                "download_date": datetime.now().isoformat()
-            }
+            # Inserção sob o lock para não concorrer com o flush (que
+            # serializa o cache) nem com outras threads do lote
+            with _metadata_lock:
+                metadata[key] = {
+                    "file_id": file_id,
+                    "video_path": video_path,
+                    "created_at": now_iso,
+                    "download_date": now_iso
+                }
+                # Manter o índice reverso coerente com a inserção
+                video_index[video_path] = key
             save_metadata(metadata)
         else:
             key = found_key
             file_id = metadata[key]["file_id"]
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
+
         # Transcricão
         if mode == "transcribe":
             transcription_filename = f"transcription_{file_id}_{timestamp}.txt"
-            transcription_path = os.path.join(config["TRANSCRIPTION_OUTPUT_DIR"], transcription_filename)
+            transcription_path = str(config["_transcription_dir"] / transcription_filename)
             
             # Verificar se temos a chave da API
             api_key = config.get("OPENAI_API_KEY")
@@ -323,8 +740,9 @@ def process_single_video(video_path: str, config: Dict, metadata: Dict, mode: st
                 logger.error("Chave da API OpenAI não encontrada. Utilize o argumento --api-key para fornecê-la.")
                 return None
             
-            logger.info(f"Transcrevendo vídeo: {video_path}")
-            success = transcribe.transcribe_video(
+            logger.info("Transcrevendo vídeo: %s", video_path)
+            success = _with_retry(
+                _core("transcribe").transcribe_video,
                 video_path=video_path,
                 output_path=transcription_path,
                 model=config.get("TRANSCRIPTION_MODEL", "whisper-1"),
@@ -332,10 +750,12 @@ def process_single_video(video_path: str, config: Dict, metadata: Dict, mode: st
             )
             
             if success:
-                metadata[key]["transcription_path"] = transcription_path
-                metadata[key]["transcription_date"] = datetime.now().isoformat()
+                with _metadata_lock:
+                    metadata[key]["transcription_path"] = transcription_path
+                    metadata[key]["transcription_date"] = now_iso
+                _note_path_written(transcription_path)
                 save_metadata(metadata)
-                logger.info(f"Transcrição concluída: {transcription_path}")
+                logger.info("Transcrição concluída: %s", transcription_path)
                 return key
             else:
                 logger.error(f"Falha ao transcrever vídeo: {video_path}")
@@ -348,52 +768,50 @@ def process_single_video(video_path: str, config: Dict, metadata: Dict, mode: st
         return None
 
 
-def process_single_transcription(transcription_path: str, config: Dict, metadata: Dict) -> Optional[str]:
+def process_single_transcription(
+    transcription_path: str,
+    config: Dict,
+    metadata: Dict,
+    transcription_index: Dict[str, str]
+) -> Optional[str]:
     """Processa uma única transcrição para resumo"""
     try:
-        # Tentar encontrar a transcrição nos metadados
-        found_key = None
-        for key, data in metadata.items():
-            if "transcription_path" in data and data["transcription_path"] == transcription_path:
-                found_key = key
-                break
-        
+        # Um único datetime.now() por item (mesma razão de process_url)
+        now = datetime.now()
+        now_iso = now.isoformat()
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
+
+        # Consulta O(1) no índice reverso caminho→chave
+        found_key = transcription_index.get(transcription_path)
+
         if not found_key:
             # Transcrição não está nos metadados, adicioná-la
             file_name = os.path.basename(transcription_path)
-            # Tentar extrair ID do nome do arquivo
-            if file_name.startswith("transcription_"):
-                parts = file_name.split("_")
-                if len(parts) >= 2:
-                    file_id = parts[1].split(".")[0]
-                    key = f"meet_{file_id}"
-                else:
-                    # Gerar ID aleatório
-                    import uuid
-                    file_id = str(uuid.uuid4())[:8]
-                    key = f"meet_{file_id}"
-            else:
-                # Gerar ID aleatório
-                import uuid
-                file_id = str(uuid.uuid4())[:8]
-                key = f"meet_{file_id}"
+            # Extrair o ID com a regex pré-compilada; nomes fora do padrão
+            # recebem um ID aleatório
+            match = _TRANS_NAME_RE.match(file_name)
+            file_id = match.group(1) if match else uuid.uuid4().hex[:8]
+            key = f"meet_{file_id}"
             
-            metadata[key] = {
-                "file_id": file_id,
-                "transcription_path": transcription_path,
-                "created_at": datetime.now().isoformat(),
-                "transcription_date": datetime.now().isoformat()
-            }
+            # Inserção sob o lock para não concorrer com o flush (que
+            # serializa o cache) nem com outras threads do lote
+            with _metadata_lock:
+                metadata[key] = {
+                    "file_id": file_id,
+                    "transcription_path": transcription_path,
+                    "created_at": now_iso,
+                    "transcription_date": now_iso
+                }
+                # Manter o índice reverso coerente com a inserção
+                transcription_index[transcription_path] = key
             save_metadata(metadata)
         else:
             key = found_key
             file_id = metadata[key]["file_id"]
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
+
         # Resumo
         summary_filename = f"summary_{file_id}_{timestamp}.md"
-        summary_path = os.path.join(config["SUMMARY_OUTPUT_DIR"], summary_filename)
+        summary_path = str(config["_summary_dir"] / summary_filename)
         
         # Verificar se temos a chave da API
         api_key = config.get("OPENAI_API_KEY")
@@ -401,8 +819,9 @@ def process_single_transcription(transcription_path: str, config: Dict, metadata
             logger.error("Chave da API OpenAI não encontrada. Utilize o argumento --api-key para fornecê-la.")
             return None
         
-        logger.info(f"Gerando resumo da transcrição: {transcription_path}")
-        success = summarize.generate_summary(
+        logger.info("Gerando resumo da transcrição: %s", transcription_path)
+        success = _with_retry(
+            _core("summarize").generate_summary,
             transcription_path=transcription_path,
             output_path=summary_path,
             model=config.get("SUMMARY_MODEL", "gpt-4"),
@@ -411,10 +830,12 @@ def process_single_transcription(transcription_path: str, config: Dict, metadata
         )
         
         if success:
-            metadata[key]["summary_path"] = summary_path
-            metadata[key]["summary_date"] = datetime.now().isoformat()
+            with _metadata_lock:
+                metadata[key]["summary_path"] = summary_path
+                metadata[key]["summary_date"] = now_iso
+            _note_path_written(summary_path)
             save_metadata(metadata)
-            logger.info(f"Resumo concluído: {summary_path}")
+            logger.info("Resumo concluído: %s", summary_path)
             return key
         else:
             logger.error(f"Falha ao gerar resumo da transcrição: {transcription_path}")
@@ -526,8 +947,9 @@ SUMMARY_LANGUAGE=pt-br
     # Garantir que os diretórios de saída existam
     ensure_output_directories(config)
     
-    # Carregar metadados
+    # Carregar metadados e construir os índices reversos caminho→chave
     metadata = load_metadata()
+    video_index, transcription_index = _build_path_indexes(metadata)
     
     # Verificar dependências específicas para o modo
     need_openai = mode in ["transcribe", "summarize", "all"] and (
@@ -559,11 +981,11 @@ SUMMARY_LANGUAGE=pt-br
         if mode == "transcribe":
             # Transcrever um vídeo específico
             logger.info(f"Transcrevendo vídeo específico: {input_path}")
-            process_single_video(input_path, config, metadata, mode)
+            process_single_video(input_path, config, metadata, mode, video_index)
         elif mode == "summarize":
             # Resumir uma transcrição específica
             logger.info(f"Gerando resumo para transcrição específica: {input_path}")
-            process_single_transcription(input_path, config, metadata)
+            process_single_transcription(input_path, config, metadata, transcription_index)
         else:
             logger.error(f"Modo '{mode}' não suportado com parâmetro --input")
             return 1
@@ -577,45 +999,42 @@ SUMMARY_LANGUAGE=pt-br
                 return 0
             
             logger.info(f"Baixando {len(urls)} vídeo(s)...")
-            for i, url in enumerate(urls):
-                logger.info(f"[{i+1}/{len(urls)}] Baixando: {url}")
-                process_url(url, config, metadata, mode)
-                
-                # Aguardar entre downloads se houver mais URLs
-                if i < len(urls) - 1:
-                    utils.wait_between_items(config["DELAY_MINUTES"])
+            process_batch(
+                urls,
+                lambda url: process_url(url, config, metadata, mode),
+                config["DELAY_MINUTES"],
+                "Baixando"
+            )
         
         elif mode == "transcribe":
             # Transcrever todos os vídeos disponíveis
-            videos = find_all_videos()
+            videos = find_all_videos(metadata, config["VIDEO_OUTPUT_DIR"])
             if not videos:
                 logger.warning("Nenhum vídeo encontrado para transcrição.")
                 return 0
             
             logger.info(f"Transcrevendo {len(videos)} vídeo(s)...")
-            for i, video_path in enumerate(videos):
-                logger.info(f"[{i+1}/{len(videos)}] Transcrevendo: {video_path}")
-                process_single_video(video_path, config, metadata, mode)
-                
-                # Aguardar entre transcrições se houver mais vídeos
-                if i < len(videos) - 1:
-                    utils.wait_between_items(config["DELAY_MINUTES"])
+            process_batch(
+                videos,
+                lambda video_path: process_single_video(video_path, config, metadata, mode, video_index),
+                config["DELAY_MINUTES"],
+                "Transcrevendo"
+            )
         
         elif mode == "summarize":
             # Resumir todas as transcrições disponíveis
-            transcriptions = find_all_transcriptions()
+            transcriptions = find_all_transcriptions(metadata, config["TRANSCRIPTION_OUTPUT_DIR"])
             if not transcriptions:
                 logger.warning("Nenhuma transcrição encontrada para resumo.")
                 return 0
             
             logger.info(f"Gerando resumos para {len(transcriptions)} transcrição(ões)...")
-            for i, transcription_path in enumerate(transcriptions):
-                logger.info(f"[{i+1}/{len(transcriptions)}] Resumindo: {transcription_path}")
-                process_single_transcription(transcription_path, config, metadata)
-                
-                # Aguardar entre resumos se houver mais transcrições
-                if i < len(transcriptions) - 1:
-                    utils.wait_between_items(config["DELAY_MINUTES"])
+            process_batch(
+                transcriptions,
+                lambda transcription_path: process_single_transcription(transcription_path, config, metadata, transcription_index),
+                config["DELAY_MINUTES"],
+                "Resumindo"
+            )
         
         else:  # mode == "all"
             # Processar todas as URLs com todas as etapas habilitadas
@@ -625,13 +1044,12 @@ SUMMARY_LANGUAGE=pt-br
                 return 0
             
             logger.info(f"Processando {len(urls)} URL(s)...")
-            for i, url in enumerate(urls):
-                logger.info(f"[{i+1}/{len(urls)}] Processando: {url}")
-                process_url(url, config, metadata, mode)
-                
-                # Aguardar entre processamentos se houver mais URLs
-                if i < len(urls) - 1:
-                    utils.wait_between_items(config["DELAY_MINUTES"])
+            process_batch(
+                urls,
+                lambda url: process_url(url, config, metadata, mode),
+                config["DELAY_MINUTES"],
+                "Processando"
+            )
     else:
         # Comportamento padrão: processar URLs do arquivo conforme configuração
         urls = read_urls(config)
@@ -640,14 +1058,13 @@ SUMMARY_LANGUAGE=pt-br
             return 0
         
         logger.info(f"Processando {len(urls)} URL(s)...")
-        for i, url in enumerate(urls):
-            logger.info(f"[{i+1}/{len(urls)}] Processando: {url}")
-            process_url(url, config, metadata, mode)
-            
-            # Aguardar entre processamentos se houver mais URLs
-            if i < len(urls) - 1:
-                utils.wait_between_items(config["DELAY_MINUTES"])
-    
+        process_batch(
+            urls,
+            lambda url: process_url(url, config, metadata, mode),
+            config["DELAY_MINUTES"],
+            "Processando"
+        )
+
     logger.info("Processamento concluído!")
     return 0
 